@@ -0,0 +1,764 @@
+
+import argparse, csv, json, os, platform, statistics, subprocess, sys, time, tracemalloc
+from distributions import DISTRIBUTIONS, generate
+
+###############################################################################
+# MEMORY BENCHMARK – peak allocation of the animation generators
+###############################################################################
+# Peak bytes per element may grow by at most this factor between the smallest
+# and largest size before the run counts as super-linear.
+MEMORY_GROWTH_LIMIT = 2.0
+
+def generator_peak_memory(gen_func, arr):
+    # Drain a generator on arr and return the peak traced allocation in bytes.
+    # The input array is allocated before tracing starts, so only the memory
+    # held by the algorithm itself (aux buffers, pending steps, frames) counts.
+    tracemalloc.start()
+    try:
+        for _ in gen_func(arr):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_memory(args):
+    from visual_algos import algo_dict
+    names = args.algo or list(algo_dict)
+    failed = []
+    print(f"{'algorithm':<16}{'n':>8}{'peak bytes':>14}{'bytes/elem':>12}")
+    for name in names:
+        per_element = []
+        for n in args.sizes:
+            arr = generate(args.dist, n, seed=args.seed)
+            peak = generator_peak_memory(algo_dict[name], arr)
+            per_element.append(peak / n)
+            print(f"{name:<16}{n:>8}{peak:>14}{peak / n:>12.1f}")
+        growth = per_element[-1] / max(per_element[0], 1e-9)
+        if growth > MEMORY_GROWTH_LIMIT:
+            failed.append((name, growth))
+    for name, growth in failed:
+        print(f"FAIL {name}: peak bytes per element grew {growth:.1f}x across sizes")
+    return 1 if failed else 0
+
+def call_peak_memory(func, arr):
+    # Peak traced allocation of one call, the input again allocated up front.
+    tracemalloc.start()
+    try:
+        func(arr)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_alloc(args):
+    # The in-place sorts must allocate less at their peak than the versions
+    # that build new lists at every recursion level.
+    from performance import inplace_algo_names, perf_algo_dict
+    failed = []
+    print(f"{'algorithm':<24}{'n':>9}{'peak bytes':>14}{'vs original':>14}")
+    for name, original_name in inplace_algo_names.items():
+        for n in args.sizes:
+            arr = generate(args.dist, n, seed=args.seed)
+            peak = call_peak_memory(perf_algo_dict[name], arr[:])
+            original_peak = call_peak_memory(perf_algo_dict[original_name], arr[:])
+            print(f"{name:<24}{n:>9}{peak:>14}{original_peak:>14}")
+            if n > 1 and peak >= original_peak:
+                failed.append((name, n))
+    for name, n in failed:
+        print(f"FAIL {name}: peak allocation at n={n} is not below {inplace_algo_names[name]}")
+    return 1 if failed else 0
+
+###############################################################################
+# TIMING BENCHMARK – size sweep over every entry in perf_algo_dict
+###############################################################################
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile of an already sorted list.
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+def machine_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "commit": commit or "unknown",
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def timing_cases(args, names, search_algo_names):
+    # Every (distribution, n, algorithm, target) combination to time. O(n^2)
+    # algorithms are skipped above --max-quadratic elements.
+    from performance import quadratic_algo_names
+    for dist in args.dist:
+        for n in args.sizes:
+            for name in names:
+                if name in quadratic_algo_names and n > args.max_quadratic:
+                    continue
+                yield dist, n, name, (args.target if name in search_algo_names else None)
+
+def time_cases_parallel(cases, args):
+    # Spread every repeat of every case over a process pool and collect the
+    # samples per case as they finish.
+    from performance import ParallelTimer, TimingJob
+    timer = ParallelTimer(workers=args.jobs)
+    jobs = [TimingJob(name, n, dist, args.seed, target, typecode=args.array)
+            for dist, n, name, target in cases for _ in range(args.repeats)]
+    # One call per sample, as in the serial path.
+    timer.submit(jobs, warmup=args.warmup, calibrate=False)
+    samples = {}
+    try:
+        while timer.busy():
+            for job, seconds in timer.poll():
+                samples.setdefault((job.dist, job.n, job.name), []).append(seconds)
+            time.sleep(0.05)
+    finally:
+        timer.shutdown()
+    return samples
+
+def case_counts(name, dist, n, args, target):
+    # Operation counts of one instrumented run of a case, or None for entries
+    # that do their work outside this interpreter (multi-process, NumPy).
+    # With --visual they come from the visualizer's generator of that name,
+    # or None if it has none.
+    from instrument import count_calls, count_steps
+    from performance import parallel_algo_names, perf_algo_dict
+    if args.visual:
+        import visual_algos
+        if name not in visual_algos.algo_dict:
+            return None
+        if target is not None:
+            visual_algos.target_value = target
+        return count_steps(visual_algos.algo_dict[name], generate(dist, n, seed=args.seed))
+    func = perf_algo_dict[name]
+    if func.__module__ != "professor_algos" or name in parallel_algo_names:
+        return None
+    return count_calls(func, generate(dist, n, seed=args.seed), target)
+
+def run_timing(args):
+    from instrument import OpCounts
+    from performance import perf_algo_dict, search_algo_names, time_runs
+    names = args.algo or list(perf_algo_dict)
+    cases = list(timing_cases(args, names, search_algo_names))
+    info = machine_info()
+    rows = []
+
+    def report(dist, n, name, times, target):
+        times = sorted(times)
+        row = dict(info, algorithm=name, distribution=dist, n=n, container=args.array or "list", repeats=args.repeats,
+                   warmup=args.warmup, jobs=args.jobs, min=times[0],
+                   median=statistics.median(times), p95=percentile(times, 95))
+        line = (f"{name:<24}{dist:<14}{n:>9}{row['min'] * 1000:>12.3f}"
+                f"{row['median'] * 1000:>12.3f}{row['p95'] * 1000:>12.3f}")
+        if args.counts:
+            counts = case_counts(name, dist, n, args, target)
+            # Every row gets the count columns so CSV output stays rectangular.
+            row.update(counts._asdict() if counts else dict.fromkeys(OpCounts._fields, ""))
+            if counts:
+                line += f"{counts.comparisons:>14}{counts.writes:>12}{counts.max_depth:>7}"
+        rows.append(row)
+        print(line)
+
+    header = f"{'algorithm':<24}{'distribution':<14}{'n':>9}{'min ms':>12}{'median ms':>12}{'p95 ms':>12}"
+    if args.counts:
+        header += f"{'comparisons':>14}{'writes':>12}{'depth':>7}"
+    print(header)
+    if args.jobs > 1:
+        samples = time_cases_parallel(cases, args)
+        for dist, n, name, target in cases:
+            report(dist, n, name, samples[(dist, n, name)], target)
+    else:
+        arr, arr_key = None, None
+        for dist, n, name, target in cases:
+            if arr_key != (dist, n):
+                arr, arr_key = generate(dist, n, seed=args.seed, typecode=args.array), (dist, n)
+            report(dist, n, name, time_runs(perf_algo_dict[name], arr, args.repeats, args.warmup, target), target)
+    if args.out:
+        write_results(rows, args.out)
+    return 0
+
+def write_results(rows, path):
+    # .json gets a list of row objects, anything else is written as CSV.
+    if path.endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=1)
+    else:
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+            writer.writeheader()
+            writer.writerows(rows)
+    print(f"Wrote {len(rows)} results to {path}")
+
+###############################################################################
+# CORRECTNESS CHECK – perf_algo_dict entries and external sort vs sorted()
+###############################################################################
+def run_check(args):
+    from performance import perf_algo_dict, quadratic_algo_names, search_algo_names
+    names = args.algo or list(perf_algo_dict)
+    failures = 0
+    for name in names:
+        func = perf_algo_dict[name]
+        for dist in args.dist:
+            for n in args.sizes:
+                if name in quadratic_algo_names and n > args.max_quadratic:
+                    continue
+                arr = generate(dist, n, seed=args.seed, typecode=args.array)
+                if name in search_algo_names:
+                    expected = [i for i, value in enumerate(arr) if value == args.target]
+                    result = func(arr[:], args.target)
+                else:
+                    expected = sorted(arr)
+                    result = func(arr[:])
+                if [int(x) for x in result] != expected:
+                    failures += 1
+                    print(f"FAIL {name} on {dist} n={n}")
+        print(f"checked {name}")
+    if not args.algo:
+        failures += check_external(args.seed)
+    print("all results match" if not failures else f"{failures} mismatches")
+    return 1 if failures else 0
+
+###############################################################################
+# SPEEDUP BENCHMARK – parallel variants against their sequential versions
+###############################################################################
+def run_speedup(args):
+    from functools import partial
+    from performance import parallel_algo_names, perf_algo_dict, time_runs
+    arr = generate(args.dist, args.n, seed=args.seed)
+    rows = []
+    for name, sequential_name in parallel_algo_names.items():
+        base = statistics.median(time_runs(perf_algo_dict[sequential_name], arr, args.repeats, 1))
+        print(f"{name}: n={args.n}, sequential {sequential_name} {base * 1000:.1f} ms")
+        for workers in args.workers:
+            func = partial(perf_algo_dict[name], workers=workers)
+            # Warmup also starts the worker pool, so it is not timed.
+            median = statistics.median(time_runs(func, arr, args.repeats, 1))
+            speedup = base / median
+            rows.append({"algorithm": name, "n": args.n, "workers": workers,
+                         "median": median, "sequential": base, "speedup": speedup})
+            print(f"  {workers:>3} cores {median * 1000:>10.1f} ms {speedup:>6.2f}x |{'#' * round(speedup * 10)}")
+    if args.out:
+        write_results(rows, args.out)
+    return 0
+
+###############################################################################
+# HYBRID BENCHMARK – Hybrid Sort against every pure Python sequential sort
+###############################################################################
+def run_hybrid(args):
+    # Hybrid Sort must win, or tie within --tolerance of the fastest rival,
+    # on every distribution. Multi-process and NumPy entries are not rivals.
+    # The candidates take turns, one sample each per round and starting one
+    # further along every round. Each round gives the ratio of the hybrid's
+    # time to the fastest rival's, and the verdict goes by the median ratio,
+    # so a burst of noise in some rounds, or drift, cannot decide it.
+    from performance import (calibrate_loops, parallel_algo_names, perf_algo_dict, quadratic_algo_names,
+                             search_algo_names, time_sample)
+    rivals = [name for name, func in perf_algo_dict.items()
+              if func.__module__ == "professor_algos" and name != "Hybrid Sort"
+              and name not in search_algo_names and name not in parallel_algo_names]
+    losses = []
+    print(f"{'distribution':<14}{'n':>9}{'hybrid ms':>12}{'best rival':>24}{'rival ms':>12}{'ratio':>8}  verdict")
+    for dist in args.dist:
+        for n in args.sizes:
+            arr = generate(dist, n, seed=args.seed, max_value=args.max_value)
+            loops = {}
+            for name in ["Hybrid Sort"] + rivals:
+                if name in quadratic_algo_names and n > args.max_quadratic:
+                    continue
+                try:
+                    loops[name] = calibrate_loops(perf_algo_dict[name], arr, min_time=0.02)
+                except RecursionError:
+                    continue  # e.g. the professor's quick_sort on organ-pipe data
+            names = list(loops)
+            times = {name: [] for name in names}
+            for r in range(args.repeats):
+                for name in names[r % len(names):] + names[:r % len(names)]:
+                    times[name].append(time_sample(perf_algo_dict[name], arr, loops[name]))
+            hybrid = times.pop("Hybrid Sort")
+            ratio = statistics.median(h / min(t[r] for t in times.values()) for r, h in enumerate(hybrid))
+            best_name = min(times, key=lambda name: statistics.median(times[name]))
+            if ratio <= 1:
+                verdict = "win"
+            elif ratio <= 1 + args.tolerance:
+                verdict = "tie"
+            else:
+                verdict = "LOSS"
+                losses.append((dist, n))
+            print(f"{dist:<14}{n:>9}{statistics.median(hybrid) * 1000:>12.3f}{best_name:>24}"
+                  f"{statistics.median(times[best_name]) * 1000:>12.3f}{ratio:>8.2f}  {verdict}")
+    return 1 if losses else 0
+
+###############################################################################
+# COMPLEXITY SWEEP – fitted growth class per algorithm against a baseline
+###############################################################################
+def run_complexity(args):
+    from performance import (CURVE_MAX_QUADRATIC, CURVE_SIZES, complexity_regressions, curve_max_value,
+                             fit_complexity, load_complexity_baseline, perf_algo_dict, quadratic_algo_names,
+                             save_complexity_baseline, search_algo_names, time_runs)
+    names = args.algo or list(perf_algo_dict)
+    sizes = args.sizes or CURVE_SIZES
+    max_quadratic = args.max_quadratic or CURVE_MAX_QUADRATIC
+    fits = {}
+    for name in names:
+        points = [n for n in sizes if not (name in quadratic_algo_names and n > max_quadratic)]
+        target = args.target if name in search_algo_names else None
+        times = [min(time_runs(perf_algo_dict[name], generate(args.dist, n, seed=args.seed,
+                                                              max_value=curve_max_value(n)),
+                               args.repeats, args.warmup, target)) for n in points]
+        fits[name] = fit_complexity(points, times)
+
+    baseline = None if args.save_baseline else load_complexity_baseline(args.baseline)
+    if baseline and baseline.get("distribution") != args.dist:
+        print(f"baseline was fitted on {baseline.get('distribution')!r} data; not comparing")
+    worse = complexity_regressions(fits, baseline, args.dist)
+    print(f"{'algorithm':<24}{'exponent':>10}{'model':>10}{'baseline':>10}  verdict")
+    for name, (model, exponent) in fits.items():
+        old = baseline["models"].get(name, "") if baseline else ""
+        verdict = "WORSE" if name in worse else ("ok" if old else "-")
+        print(f"{name:<24}{exponent:>10.2f}{model:>10}{old:>10}  {verdict}")
+    if args.save_baseline:
+        save_complexity_baseline(fits, args.dist, sizes, args.baseline)
+        print(f"Wrote baseline to {args.baseline}")
+    return 1 if worse else 0
+
+###############################################################################
+# TRACE BENCHMARK – size, record speed and seek latency of step traces
+###############################################################################
+def run_trace(args):
+    import random, tempfile
+    from visual_algos import algo_dict
+    from step_trace import Trace, record_trace
+    names = args.algo or list(algo_dict)
+    failed = []
+    print(f"{'algorithm':<16}{'n':>7}{'steps':>11}{'bytes/step':>12}{'record/s':>12}{'seek ms':>9}")
+    for name in names:
+        for n in args.sizes:
+            arr = generate(args.dist, n, seed=args.seed)
+            fd, path = tempfile.mkstemp(suffix=".trace")
+            os.close(fd)
+            try:
+                start = time.perf_counter()
+                steps = record_trace(algo_dict[name], arr, path)
+                record_time = time.perf_counter() - start
+                trace = Trace(path)
+                rng = random.Random(args.seed)
+                start = time.perf_counter()
+                for _ in range(args.seeks):
+                    trace.state_at(rng.randint(0, steps))
+                seek_ms = (time.perf_counter() - start) / args.seeks * 1000
+                # The last position must be the sorted array (searches leave it as is).
+                if trace.state_at(steps) != sorted(arr) and name != "Linear Search":
+                    failed.append((name, n))
+                trace.close()
+                size = os.path.getsize(path)
+            finally:
+                os.remove(path)
+            print(f"{name:<16}{n:>7}{steps:>11}{size / max(steps, 1):>12.1f}"
+                  f"{steps / max(record_time, 1e-9):>12.0f}{seek_ms:>9.2f}")
+    for name, n in failed:
+        print(f"FAIL {name}: replaying the trace at n={n} does not end sorted")
+    return 1 if failed else 0
+
+###############################################################################
+# IMPORT TIME – the headless modules load fast and without pygame or numpy
+###############################################################################
+HEADLESS_MODULES = ["distributions", "professor_algos", "instrument", "performance",
+                    "visual_algos", "step_trace", "profiling", "bench"]
+# Loaded only by the code that needs them: pygame by main.py, numpy by the
+# first call of a NumPy entry.
+LAZY_MODULES = ["pygame", "numpy"]
+
+def import_times(module):
+    # {module: cumulative ms} for everything a fresh interpreter imports
+    # while running `import module` (python -X importtime).
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in proc.stderr.splitlines():
+        fields = line.split("|")
+        if line.startswith("import time:") and len(fields) == 3 and fields[1].strip().isdigit():
+            times[fields[2].strip()] = int(fields[1]) / 1000
+    return times
+
+def run_importtime(args):
+    failed = []
+    print(f"{'module':<18}{'import ms':>10}  lazy modules pulled in")
+    for module in args.module or HEADLESS_MODULES:
+        # Best of several fresh interpreters; one run is mostly disk noise.
+        runs = [import_times(module) for _ in range(args.repeats)]
+        best = min(times[module] for times in runs)
+        eager = sorted({m.split(".")[0] for times in runs for m in times} & set(LAZY_MODULES))
+        print(f"{module:<18}{best:>10.1f}  {', '.join(eager) or '-'}")
+        if best > args.budget_ms or eager:
+            failed.append((module, best, eager))
+    for module, best, eager in failed:
+        reason = f"imports {', '.join(eager)}" if eager else f"takes {best:.1f} ms"
+        print(f"FAIL {module}: {reason} (budget {args.budget_ms:g} ms, no {', '.join(LAZY_MODULES)})")
+    return 1 if failed else 0
+
+###############################################################################
+# EXTERNAL SORT – a generated file sorted under a memory budget
+###############################################################################
+def write_dataset(path, n, dist, seed, fmt, chunk=1 << 18):
+    # n values of the distribution, generated chunk by chunk so the dataset
+    # never has to fit in memory. Returns the sum, for the check afterwards.
+    from external_sort import IOCounter, write_values
+
+    def values():
+        for i, start in enumerate(range(0, n, chunk)):
+            yield from generate(dist, min(chunk, n - start), seed=seed + i, max_value=2**31 - 1)
+
+    total = 0
+
+    def summed():
+        nonlocal total
+        for x in values():
+            total += x
+            yield x
+
+    write_values(summed(), path, fmt, chunk, IOCounter())
+    return total
+
+def check_external(seed, n=20000, budgets=(16 << 10, 64 << 10)):
+    # External sort in both formats on budgets small enough to force several
+    # merge passes, against sorted(); returns the number of failures.
+    import tempfile
+    from external_sort import FORMATS, IOCounter, external_sort, read_values
+    failures = 0
+    with tempfile.TemporaryDirectory(prefix="extsort-check-") as work:
+        src, dst = os.path.join(work, "input"), os.path.join(work, "output")
+        for fmt in FORMATS:
+            write_dataset(src, n, "random", seed, fmt)
+            expected = sorted(read_values(src, fmt, 1 << 16, IOCounter()))
+            for memory_bytes in budgets:
+                stats = external_sort(src, dst, memory_bytes, fmt, work)
+                if list(read_values(dst, fmt, 1 << 16, IOCounter())) != expected:
+                    failures += 1
+                    print(f"FAIL external sort ({fmt}) with {memory_bytes} bytes, {stats.passes} passes")
+    print("checked external sort")
+    return failures
+
+def run_external(args):
+    import tempfile
+    from external_sort import IOCounter, external_sort, read_values
+    memory_bytes = int(args.memory_mb * (1 << 20))
+    with tempfile.TemporaryDirectory(prefix="extsort-bench-") as work:
+        src, dst = os.path.join(work, "input"), os.path.join(work, "output")
+        total = write_dataset(src, args.n, args.dist, args.seed, args.format)
+        stats = external_sort(src, dst, memory_bytes, args.format, work)
+        # Stream the output back: sorted, same count, same sum.
+        count, out_total, previous, ordered = 0, 0, None, True
+        for x in read_values(dst, args.format, 1 << 16, IOCounter()):
+            if previous is not None and x < previous:
+                ordered = False
+            previous = x
+            count += 1
+            out_total += x
+    mb = 1 << 20
+    io_mb = (stats.bytes_read + stats.bytes_written) / mb
+    merge_seconds = stats.seconds - stats.io_seconds - stats.sort_seconds
+    print(f"n={stats.items} ({args.format}, {args.dist}) with {args.memory_mb:g} MB: "
+          f"{stats.runs} runs, {stats.passes} passes")
+    print(f"  read {stats.bytes_read / mb:.1f} MB, wrote {stats.bytes_written / mb:.1f} MB, "
+          f"I/O {stats.io_seconds:.2f} s ({io_mb / max(stats.io_seconds, 1e-9):.0f} MB/s)")
+    print(f"  chunk sorts {stats.sort_seconds:.2f} s, merging {merge_seconds:.2f} s, "
+          f"total {stats.seconds:.2f} s ({stats.items / max(stats.seconds, 1e-9):.0f} values/s)")
+    if not ordered or count != args.n or out_total != total:
+        print("FAIL output is not a sorted permutation of the input")
+        return 1
+    return 0
+
+###############################################################################
+# SEARCH THROUGHPUT – single-target scans against batched and indexed lookups
+###############################################################################
+def run_search(args):
+    import random
+    import professor_algos as p_algos
+    from performance import HAVE_NUMPY
+    from search import INDEX_KINDS, SearchIndex, batch_linear_search
+    kinds = [k for k in INDEX_KINDS if k != "numpy" or HAVE_NUMPY]
+    if HAVE_NUMPY:
+        SearchIndex([0], "numpy").find_all([0])  # import numpy outside the timings
+    print(f"{'n':>9}{'queries':>9}  {'method':<16}{'build ms':>10}{'query ms':>10}{'queries/s':>12}")
+    for n in args.sizes:
+        arr = generate(args.dist, n, seed=args.seed, max_value=args.max_value)
+        rng = random.Random(args.seed)
+        targets = [rng.randint(1, args.max_value) for _ in range(args.queries)]
+        rows = []
+        start = time.perf_counter()
+        # Single-target scans are timed on a prefix of the batch and scaled up.
+        sample = targets[:max(1, min(len(targets), 10**7 // max(n, 1)))]
+        expected = [p_algos.linear_search_all(arr, t) for t in sample]
+        scan = (time.perf_counter() - start) * len(targets) / len(sample)
+        rows.append(("linear x queries", 0.0, scan))
+        start = time.perf_counter()
+        batch_linear_search(arr, targets)
+        rows.append(("one scan", 0.0, time.perf_counter() - start))
+        for kind in kinds:
+            index = SearchIndex(arr, kind)
+            start = time.perf_counter()
+            index.find_all([])  # build only
+            built = time.perf_counter()
+            found = index.find_all(targets)
+            rows.append((f"{kind} index", built - start, time.perf_counter() - built))
+            if found[:len(sample)] != expected:
+                print(f"FAIL {kind} index disagrees with linear_search_all at n={n}")
+                return 1
+        for method, build, query in rows:
+            print(f"{n:>9}{len(targets):>9}  {method:<16}{build * 1000:>10.2f}{query * 1000:>10.2f}"
+                  f"{len(targets) / max(build + query, 1e-9):>12.0f}")
+    return 0
+
+###############################################################################
+# TYPED ARRAYS – list of int objects against a compact array.array
+###############################################################################
+TYPED_ALGOS = ["Merge Sort", "Merge Sort (in-place)", "Quick Sort (in-place)", "Radix Sort",
+               "Hybrid Sort", "Radix Sort (NumPy)"]
+
+def container_bytes(dist, n, seed, typecode):
+    # Traced bytes held by one generated input: the list and its int objects,
+    # or the array buffer. Keys are drawn up to 2^31 so the small-int cache
+    # does not hide the int objects.
+    tracemalloc.start()
+    try:
+        data = generate(dist, n, seed=seed, max_value=2**31 - 1, typecode=typecode)
+        return data, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+def run_typed(args):
+    from performance import perf_algo_dict, time_runs
+    names = args.algo or [name for name in TYPED_ALGOS if name in perf_algo_dict]
+    containers = {}
+    print(f"n={args.n} ({args.dist})")
+    print(f"{'container':<14}{'input MB':>10}{'bytes/elem':>12}{'copy ms':>10}")
+    for label, typecode in (("list", None), (f"array('{args.typecode}')", args.typecode)):
+        data, size = container_bytes(args.dist, args.n, args.seed, typecode)
+        copy = min(time_runs(lambda a: a[:], data, args.repeats))
+        containers[label] = data
+        print(f"{label:<14}{size / (1 << 20):>10.1f}{size / max(args.n, 1):>12.1f}{copy * 1000:>10.2f}")
+    print(f"{'algorithm':<24}" + "".join(f"{label + ' ms':>16}" for label in containers) + f"{'ratio':>8}")
+    for name in names:
+        perf_algo_dict[name](generate(args.dist, 100, seed=args.seed))  # imports, first-call set-up
+        times = [min(time_runs(perf_algo_dict[name], data, args.repeats)) for data in containers.values()]
+        print(f"{name:<24}" + "".join(f"{t * 1000:>16.1f}" for t in times) + f"{times[1] / times[0]:>8.2f}")
+    return 0
+
+###############################################################################
+# PROFILE – phase breakdown, cProfile, tracemalloc or folded stacks of a run
+###############################################################################
+def run_profile(args):
+    from collections import Counter
+    import profiling
+    from performance import parallel_algo_names, perf_algo_dict, quadratic_algo_names, search_algo_names
+    from visual_algos import algo_dict
+    funcs = algo_dict if args.visual else perf_algo_dict
+    # By default the sorts with phase marks: the in-process Python ones.
+    names = args.algo or [name for name, func in funcs.items()
+                          if func.__module__ in profiling.HOOKED_MODULES and name not in parallel_algo_names
+                          and name not in quadratic_algo_names and name not in search_algo_names]
+    if args.mode == "cprofile" and args.out and len(names) > 1:
+        print("cprofile --out takes a single --algo")
+        return 2
+    arr = generate(args.dist, args.n, seed=args.seed)
+    stacks = Counter()
+    # Folded stacks without --out go to stdout, so the header goes to stderr.
+    print(f"n={args.n} ({args.dist}), {'visual_algos generators' if args.visual else 'perf_algo_dict'}",
+          file=sys.stderr if args.mode == "folded" and not args.out else sys.stdout)
+    for name in names:
+        func = funcs[name]
+        # The visual Linear Search reads visual_algos.target_value instead.
+        func_target = arr[len(arr) // 2] if name in search_algo_names and not args.visual else None
+        if args.mode == "phases":
+            profile = profiling.profile_phases(func, arr, func_target, memory=args.memory)
+            print(f"{name}: {profile.total * 1000:.1f} ms")
+            for phase, seconds in profile.seconds.items():
+                line = f"  {phase:<14}{seconds * 1000:>10.1f} ms{seconds / profile.total:>7.1%}"
+                if args.memory:
+                    line += f"{profile.peak_bytes.get(phase, 0) / 1024:>10.0f} KiB peak"
+                print(line)
+        elif args.mode == "cprofile":
+            stats = profiling.capture_cprofile(func, arr, func_target)
+            if args.out:
+                stats.dump_stats(args.out)
+                print(f"Wrote {args.out} (open with pstats or snakeviz)")
+            else:
+                print(f"{name}:")
+                stats.sort_stats("cumulative").print_stats(args.limit)
+        elif args.mode == "tracemalloc":
+            peak, top = profiling.capture_tracemalloc(func, arr, func_target, args.limit)
+            print(f"{name}: peak {peak / 1024:.0f} KiB; still allocated at return:")
+            if not top:
+                print("  nothing")
+            for stat in top:
+                frame = stat.traceback[0]
+                print(f"  {os.path.basename(frame.filename)}:{frame.lineno:<6}{stat.size / 1024:>10.0f} KiB{stat.count:>9} blocks")
+        else:
+            stacks += profiling.folded_stacks(func, arr, func_target)
+    if args.mode == "folded":
+        profiling.write_folded(stacks, args.out or sys.stdout)
+        if args.out:
+            print(f"Wrote {len(stacks)} stacks to {args.out} (flamegraph.pl, speedscope)")
+    return 0
+
+###############################################################################
+# COMMAND LINE
+###############################################################################
+def parse_sizes(text):
+    return [int(float(x)) for x in text.split(',') if x.strip()]
+
+def parse_distributions(text):
+    if text == "all":
+        return list(DISTRIBUTIONS)
+    names = [x.strip() for x in text.split(',') if x.strip()]
+    for name in names:
+        if name not in DISTRIBUTIONS:
+            raise argparse.ArgumentTypeError(f"unknown distribution {name!r}")
+    return names
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the sorting visualizer.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    timing = sub.add_parser("time", help="time every perf_algo_dict entry over a sweep of sizes")
+    timing.add_argument("--algo", action="append", help="algorithm name from perf_algo_dict (repeatable)")
+    timing.add_argument("--sizes", type=parse_sizes, default=[10, 100, 1000, 10000, 100000, 1000000])
+    timing.add_argument("--repeats", type=int, default=5)
+    timing.add_argument("--warmup", type=int, default=1)
+    timing.add_argument("--max-quadratic", type=int, default=5000,
+                        help="largest n to run O(n^2) algorithms on")
+    timing.add_argument("--jobs", type=int, default=1,
+                        help="spread the runs over this many worker processes")
+    timing.add_argument("--target", type=int, default=50, help="target value for searches")
+    timing.add_argument("--dist", type=parse_distributions, default=["random"],
+                        help="comma separated distributions, or 'all'")
+    timing.add_argument("--seed", type=int, default=0)
+    timing.add_argument("--counts", action="store_true",
+                        help="add comparisons, swaps, writes, aux memory and call depth (see instrument.py)")
+    timing.add_argument("--visual", action="store_true",
+                        help="with --counts, count the visualizer's step generators instead")
+    timing.add_argument("--array", metavar="TYPECODE",
+                        help="time on array.array(TYPECODE) inputs (e.g. q) instead of lists")
+    timing.add_argument("--out", help="write results to a .csv or .json file")
+    timing.set_defaults(func=run_timing)
+
+    check = sub.add_parser("check", help="verify every perf_algo_dict entry against sorted()")
+    check.add_argument("--algo", action="append", help="algorithm name from perf_algo_dict (repeatable)")
+    check.add_argument("--sizes", type=parse_sizes, default=[0, 1, 2, 3, 17, 100, 1000, 12345])
+    check.add_argument("--dist", type=parse_distributions, default=list(DISTRIBUTIONS))
+    check.add_argument("--max-quadratic", type=int, default=1000)
+    check.add_argument("--target", type=int, default=50)
+    check.add_argument("--seed", type=int, default=0)
+    check.add_argument("--array", metavar="TYPECODE", help="check on array.array(TYPECODE) inputs (e.g. q)")
+    check.set_defaults(func=run_check)
+
+    speedup = sub.add_parser("speedup", help="chart parallel sort speedup against core count")
+    speedup.add_argument("--n", type=lambda x: int(float(x)), default=200000)
+    speedup.add_argument("--workers", type=parse_sizes, default=list(range(1, (os.cpu_count() or 1) + 1)))
+    speedup.add_argument("--repeats", type=int, default=3)
+    speedup.add_argument("--dist", choices=list(DISTRIBUTIONS), default="random")
+    speedup.add_argument("--seed", type=int, default=0)
+    speedup.add_argument("--out", help="write results to a .csv or .json file")
+    speedup.set_defaults(func=run_speedup)
+
+    hybrid = sub.add_parser("hybrid", help="check Hybrid Sort wins or ties on every distribution")
+    hybrid.add_argument("--sizes", type=parse_sizes, default=[1000, 50000])
+    hybrid.add_argument("--dist", type=parse_distributions, default=list(DISTRIBUTIONS))
+    hybrid.add_argument("--max-value", type=int, default=10**6, help="largest value for most distributions")
+    hybrid.add_argument("--repeats", type=int, default=15)
+    hybrid.add_argument("--tolerance", type=float, default=0.10, help="relative slowdown that still counts as a tie")
+    hybrid.add_argument("--max-quadratic", type=int, default=2000)
+    hybrid.add_argument("--seed", type=int, default=0)
+    hybrid.set_defaults(func=run_hybrid)
+
+    complexity = sub.add_parser("complexity", help="fit n / n log n / n^2 per algorithm, flag worse classes")
+    complexity.add_argument("--algo", action="append", help="algorithm name from perf_algo_dict (repeatable)")
+    complexity.add_argument("--sizes", type=parse_sizes, help="sizes to time (default 256 to 16384, doubling)")
+    complexity.add_argument("--dist", choices=list(DISTRIBUTIONS), default="random")
+    complexity.add_argument("--repeats", type=int, default=5)
+    complexity.add_argument("--warmup", type=int, default=1)
+    complexity.add_argument("--max-quadratic", type=int, help="largest n to run O(n^2) algorithms on")
+    complexity.add_argument("--target", type=int, default=50, help="target value for searches")
+    complexity.add_argument("--seed", type=int, default=0)
+    complexity.add_argument("--baseline", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                               "complexity_baseline.json"))
+    complexity.add_argument("--save-baseline", action="store_true",
+                            help="record the fitted classes instead of comparing against them")
+    complexity.set_defaults(func=run_complexity)
+
+    mem = sub.add_parser("memory", help="assert the animation generators use O(n) peak memory")
+    mem.add_argument("--algo", action="append", help="algorithm name from algo_dict (repeatable)")
+    mem.add_argument("--sizes", type=parse_sizes, default=[128, 256, 512, 1024, 2048])
+    mem.add_argument("--dist", choices=list(DISTRIBUTIONS), default="random")
+    mem.add_argument("--seed", type=int, default=0)
+    mem.set_defaults(func=run_memory)
+
+    alloc = sub.add_parser("alloc", help="assert the in-place sorts allocate less than the originals")
+    alloc.add_argument("--sizes", type=parse_sizes, default=[100, 1000, 10000, 100000])
+    alloc.add_argument("--dist", choices=list(DISTRIBUTIONS), default="random")
+    alloc.add_argument("--seed", type=int, default=0)
+    alloc.set_defaults(func=run_alloc)
+
+    tr = sub.add_parser("trace", help="record step traces, report size, record speed and seek latency")
+    tr.add_argument("--algo", action="append", help="algorithm name from algo_dict (repeatable)")
+    tr.add_argument("--sizes", type=parse_sizes, default=[100, 1000])
+    tr.add_argument("--dist", choices=list(DISTRIBUTIONS), default="random")
+    tr.add_argument("--seeks", type=int, default=200, help="random seeks timed per trace")
+    tr.add_argument("--seed", type=int, default=0)
+    tr.set_defaults(func=run_trace)
+
+    imp = sub.add_parser("importtime", help="assert the headless modules import quickly without pygame")
+    imp.add_argument("--module", action="append", help="module to check (repeatable, default: all headless ones)")
+    imp.add_argument("--budget-ms", type=float, default=100.0, help="max cumulative import time per module")
+    imp.add_argument("--repeats", type=int, default=5)
+    imp.set_defaults(func=run_importtime)
+
+    ext = sub.add_parser("external", help="external merge sort of a generated file under a memory budget")
+    ext.add_argument("--n", type=int, default=2_000_000)
+    ext.add_argument("--memory-mb", type=float, default=8)
+    ext.add_argument("--format", choices=["bin", "text"], default="bin")
+    ext.add_argument("--dist", choices=list(DISTRIBUTIONS), default="random")
+    ext.add_argument("--seed", type=int, default=0)
+    ext.set_defaults(func=run_external)
+
+    srch = sub.add_parser("search", help="queries/s of linear scans, one batched scan and the search indexes")
+    srch.add_argument("--sizes", type=parse_sizes, default=[1000, 100000])
+    srch.add_argument("--queries", type=int, default=1000)
+    srch.add_argument("--max-value", type=int, default=10**6)
+    srch.add_argument("--dist", choices=list(DISTRIBUTIONS), default="random")
+    srch.add_argument("--seed", type=int, default=0)
+    srch.set_defaults(func=run_search)
+
+    typed = sub.add_parser("typed", help="memory and time of list input against array.array input")
+    typed.add_argument("--algo", action="append", help="algorithm name from perf_algo_dict (repeatable)")
+    typed.add_argument("--n", type=int, default=1_000_000)
+    typed.add_argument("--typecode", default="q")
+    typed.add_argument("--repeats", type=int, default=1)
+    typed.add_argument("--dist", choices=list(DISTRIBUTIONS), default="random")
+    typed.add_argument("--seed", type=int, default=0)
+    typed.set_defaults(func=run_typed)
+
+    prof = sub.add_parser("profile", help="phase breakdown, cProfile, tracemalloc or flame graph stacks of a run")
+    prof.add_argument("--algo", action="append", help="algorithm name (repeatable, default: the sequential sorts)")
+    prof.add_argument("--mode", choices=["phases", "cprofile", "tracemalloc", "folded"], default="phases")
+    prof.add_argument("--visual", action="store_true", help="profile the animation generators instead")
+    prof.add_argument("--memory", action="store_true", help="phases: also trace peak memory per phase (slower)")
+    prof.add_argument("--limit", type=int, default=15, help="cprofile / tracemalloc: lines to show")
+    prof.add_argument("--out", help="cprofile: .prof file to write; folded: stack file (default: stdout)")
+    prof.add_argument("--n", type=int, default=100000)
+    prof.add_argument("--dist", choices=list(DISTRIBUTIONS), default="random")
+    prof.add_argument("--seed", type=int, default=0)
+    prof.set_defaults(func=run_profile)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
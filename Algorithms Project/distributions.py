@@ -0,0 +1,84 @@
+
+import random
+from array import array
+
+###############################################################################
+# INPUT DISTRIBUTIONS
+#
+# Every generator takes (n, rng, max_value) and returns a list of n ints.
+# rng is a random.Random, so the same seed always gives the same data.
+###############################################################################
+def random_values(n, rng, max_value):
+    return [rng.randint(1, max_value) for _ in range(n)]
+
+def sorted_values(n, rng, max_value):
+    return sorted(random_values(n, rng, max_value))
+
+def reversed_values(n, rng, max_value):
+    return sorted(random_values(n, rng, max_value), reverse=True)
+
+def nearly_sorted_values(n, rng, max_value):
+    # Sorted data with about 5% of the elements swapped out of place.
+    arr = sorted_values(n, rng, max_value)
+    for _ in range(n // 20):
+        i, j = rng.randrange(n), rng.randrange(n)
+        arr[i], arr[j] = arr[j], arr[i]
+    return arr
+
+def few_unique_values(n, rng, max_value):
+    # Only a handful of distinct keys, lots of duplicates.
+    keys = [rng.randint(1, max_value) for _ in range(5)]
+    return [rng.choice(keys) for _ in range(n)]
+
+def organ_pipe_values(n, rng, max_value):
+    # Ascending first half, descending second half.
+    half = sorted_values((n + 1) // 2, rng, max_value)
+    return half + half[:n // 2][::-1]
+
+def sawtooth_values(n, rng, max_value):
+    # Several short ascending runs back to back.
+    teeth = max(1, min(n, 8))
+    arr = []
+    for t in range(teeth):
+        size = n // teeth + (1 if t < n % teeth else 0)
+        arr.extend(sorted_values(size, rng, max_value))
+    return arr
+
+def zipf_values(n, rng, max_value, s=1.1):
+    # Small values are very common, large values are rare (Zipf's law).
+    # Ranks beyond n would almost never be drawn, so they are left out.
+    keys = range(1, min(max_value, max(n, 1)) + 1)
+    weights = [1 / k ** s for k in keys]
+    return rng.choices(keys, weights=weights, k=n)
+
+def signed_values(n, rng, max_value):
+    # Negative and positive keys around zero (the manual-entry box accepts
+    # both), for checking that the radix sorts offset their keys.
+    return [rng.randint(-max_value, max_value) for _ in range(n)]
+
+def wide_range_values(n, rng, max_value):
+    # Ignores max_value: keys spread over the whole 32-bit signed range, so
+    # radix sorts need their full number of digit passes.
+    return [rng.randint(1, 2**31 - 1) for _ in range(n)]
+
+DISTRIBUTIONS = {
+    "random": random_values,
+    "sorted": sorted_values,
+    "reversed": reversed_values,
+    "nearly_sorted": nearly_sorted_values,
+    "few_unique": few_unique_values,
+    "organ_pipe": organ_pipe_values,
+    "sawtooth": sawtooth_values,
+    "zipf": zipf_values,
+    "wide_range": wide_range_values,
+    "signed": signed_values,
+}
+
+def generate(name, n, seed=None, max_value=100, typecode=None):
+    # Build n values from the named distribution. seed=None gives fresh data
+    # every call; any other seed is reproducible. With a typecode (e.g. "q")
+    # the values come back as a compact array.array instead of a list.
+    if name not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution {name!r}; choose from {', '.join(DISTRIBUTIONS)}")
+    values = DISTRIBUTIONS[name](n, random.Random(seed), max_value)
+    return values if typecode is None else array(typecode, values)
@@ -0,0 +1,169 @@
+
+import heapq, os, sys, tempfile, time
+from array import array
+from collections import namedtuple
+from io import DEFAULT_BUFFER_SIZE
+from itertools import islice
+import professor_algos as p_algos
+
+###############################################################################
+# EXTERNAL MERGE SORT – integer files larger than memory
+#
+# The first pass reads the input one chunk at a time, sorts every chunk with
+# Hybrid Sort and spills it to a temp file as a run of raw int64s. Merge
+# passes then combine up to MAX_FAN_IN runs at a time with heapq.merge, each
+# run read through its own fixed-size buffer, until the last merge writes
+# the output. Input and output are either raw int64 files in machine byte
+# order ("bin") or integers separated by whitespace or commas ("text").
+#
+# Every open file also holds DEFAULT_BUFFER_SIZE bytes of its own, a read
+# briefly holds its block twice and a write copies it out in pieces, so a
+# merge leaves two buffers' worth spare. Text is read buffer_items bytes at
+# a time: split into tokens and ints, a byte of text takes about as much
+# memory as a binary item.
+###############################################################################
+ITEM_BYTES = 8          # one value in a run file or an I/O buffer
+# Peak bytes per element while Hybrid Sort runs on a chunk list: the int
+# objects, the list, and the key set / radix buffers (measured with
+# tracemalloc on wide-range keys, rounded up).
+SORT_ITEM_BYTES = 192
+# Peak bytes per value while a block is formatted as text (the str objects,
+# the joined text and its encoding; measured the same way).
+TEXT_ITEM_BYTES = 96
+MAX_FAN_IN = 64
+MIN_BUFFER_ITEMS = 1024
+FORMATS = ("bin", "text")
+
+ExternalSortStats = namedtuple("ExternalSortStats",
+                               "items runs passes bytes_read bytes_written io_seconds sort_seconds seconds")
+
+class IOCounter:
+    # Bytes moved and seconds spent inside file reads and writes.
+    def __init__(self):
+        self.bytes_read = self.bytes_written = 0
+        self.seconds = 0.0
+
+def read_values(path, fmt, buffer_items, io):
+    # The integers in path, read buffer_items at a time (for text, blocks of
+    # buffer_items bytes, whatever the line lengths).
+    carry = b""  # text: a number cut off at the end of the last block
+    with open(path, "rb") as f:
+        while True:
+            start = time.perf_counter()
+            if fmt == "bin":
+                block = array('q')
+                try:
+                    block.fromfile(f, buffer_items)
+                except EOFError:
+                    pass  # the last block is short
+                size = len(block) * ITEM_BYTES
+            else:
+                data = f.read(buffer_items).replace(b",", b" ")
+                size = len(data)
+                tokens = (carry + data).split()
+                carry = tokens.pop() if size and tokens and not data[-1:].isspace() else b""
+                block = [int(token) for token in tokens]
+            io.seconds += time.perf_counter() - start
+            io.bytes_read += size
+            yield from block
+            if not size:
+                return
+
+def write_values(values, path, fmt, buffer_items, io):
+    # Write an iterable of integers to path, buffer_items at a time.
+    values = iter(values)
+    with open(path, "wb") as f:
+        while True:
+            block = array('q', islice(values, buffer_items))
+            if not block:
+                return
+            start = time.perf_counter()
+            if fmt == "bin":
+                block.tofile(f)
+                size = len(block) * ITEM_BYTES
+            else:
+                # Formatted a slice at a time to stay within the buffer's bytes.
+                step = max(1, len(block) * ITEM_BYTES // TEXT_ITEM_BYTES)
+                size = 0
+                for i in range(0, len(block), step):
+                    data = ("\n".join(map(str, block[i:i + step])) + "\n").encode()
+                    f.write(data)
+                    size += len(data)
+            io.seconds += time.perf_counter() - start
+            io.bytes_written += size
+            del block  # before the next one is filled
+
+def stream_buffer_items(memory_bytes, streams):
+    # Items per buffer with `streams` files open at once, two buffers spare.
+    return (memory_bytes // (streams + 2) - DEFAULT_BUFFER_SIZE) // ITEM_BYTES
+
+def merge_fan_in(memory_bytes):
+    # As many runs per merge as still leave MIN_BUFFER_ITEMS per buffer
+    # (one buffer per run plus the output buffer).
+    streams = memory_bytes // (MIN_BUFFER_ITEMS * ITEM_BYTES + DEFAULT_BUFFER_SIZE) - 2
+    return max(2, min(MAX_FAN_IN, streams - 1))
+
+def external_sort(src, dst, memory_bytes=64 << 20, fmt="bin", tmp_dir=None):
+    # Sort the integers in src into dst (same format) with about memory_bytes
+    # of data in memory at any time. Returns ExternalSortStats.
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; choose from {', '.join(FORMATS)}")
+    began = time.perf_counter()
+    io = IOCounter()
+    # A sixteenth of the budget buffers the input and run files, the rest
+    # holds the chunk being sorted.
+    buffer_items = max(MIN_BUFFER_ITEMS, memory_bytes // (16 * ITEM_BYTES))
+    chunk_items = max(MIN_BUFFER_ITEMS, (memory_bytes - buffer_items * ITEM_BYTES) // SORT_ITEM_BYTES)
+    fan_in = merge_fan_in(memory_bytes)
+    items = sort_seconds = 0
+    with tempfile.TemporaryDirectory(prefix="extsort-", dir=tmp_dir) as work:
+        runs = []
+        values = read_values(src, fmt, buffer_items, io)
+        while True:
+            chunk = list(islice(values, chunk_items))
+            if not chunk:
+                break
+            start = time.perf_counter()
+            chunk = p_algos.hybrid_sort(chunk)
+            sort_seconds += time.perf_counter() - start
+            items += len(chunk)
+            runs.append(os.path.join(work, f"run{len(runs)}.bin"))
+            write_values(chunk, runs[-1], "bin", buffer_items, io)
+        chunk = None
+        initial_runs, passes = len(runs), 1
+        # Intermediate passes until one merge can take every remaining run.
+        while len(runs) > fan_in:
+            buffer_items = max(MIN_BUFFER_ITEMS, stream_buffer_items(memory_bytes, fan_in + 1))
+            merged = []
+            for i in range(0, len(runs), fan_in):
+                group = runs[i:i + fan_in]
+                merged.append(os.path.join(work, f"pass{passes}-{len(merged)}.bin"))
+                write_values(heapq.merge(*(read_values(run, "bin", buffer_items, io) for run in group)),
+                             merged[-1], "bin", buffer_items, io)
+                for run in group:
+                    os.remove(run)
+            runs = merged
+            passes += 1
+        buffer_items = max(MIN_BUFFER_ITEMS, stream_buffer_items(memory_bytes, len(runs) + 1))
+        write_values(heapq.merge(*(read_values(run, "bin", buffer_items, io) for run in runs)),
+                     dst, fmt, buffer_items, io)
+        passes += 1 if runs else 0
+    return ExternalSortStats(items, initial_runs, passes, io.bytes_read, io.bytes_written,
+                             io.seconds, sort_seconds, time.perf_counter() - began)
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Sort an integer file that does not fit in memory.")
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    parser.add_argument("--format", choices=FORMATS, default="bin",
+                        help="bin: raw int64 (machine byte order); text: whitespace or comma separated")
+    parser.add_argument("--memory-mb", type=float, default=64, help="memory budget for the data")
+    parser.add_argument("--tmp-dir", help="where sorted runs are spilled (default: system temp)")
+    args = parser.parse_args(argv)
+    stats = external_sort(args.src, args.dst, int(args.memory_mb * (1 << 20)), args.format, args.tmp_dir)
+    print(f"{stats.items} values, {stats.runs} runs, {stats.passes} passes, {stats.seconds:.2f} s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+
+import sys, tracemalloc
+from collections import namedtuple
+
+###############################################################################
+# OPERATION COUNTS – comparisons, swaps, writes, aux memory, recursion depth
+#
+# The algorithms themselves are never changed, so there is no cost while
+# nothing is being counted. count_calls() runs a professor_algos function on
+# a CountingList of CountingInt keys, and count_steps() drains a
+# visual_algos.py generator and tallies its step events. Both trace
+# allocations and track call depth in the algorithm's own module while they
+# run.
+###############################################################################
+# writes include both writes of every swap (two writes that exchange the same
+# two objects count as one); reads are indexed reads only, iterating over
+# the list is not counted.
+OpCounts = namedtuple("OpCounts", "comparisons swaps writes reads aux_bytes max_depth")
+
+class _Tally:
+    def __init__(self):
+        self.comparisons = self.swaps = self.writes = self.reads = 0
+        self.last_write = None  # (index, old value, new value) for swap detection
+
+_tally = None
+
+class CountingInt(int):
+    # An int whose comparisons are counted. Arithmetic returns plain ints, so
+    # keys derived from it (radix digits, offsets) are not counted.
+    __slots__ = ()
+
+    def __lt__(self, other):
+        _tally.comparisons += 1
+        return int.__lt__(self, other)
+
+    def __le__(self, other):
+        _tally.comparisons += 1
+        return int.__le__(self, other)
+
+    def __gt__(self, other):
+        _tally.comparisons += 1
+        return int.__gt__(self, other)
+
+    def __ge__(self, other):
+        _tally.comparisons += 1
+        return int.__ge__(self, other)
+
+    def __eq__(self, other):
+        _tally.comparisons += 1
+        return int.__eq__(self, other)
+
+    def __ne__(self, other):
+        _tally.comparisons += 1
+        return int.__ne__(self, other)
+
+    __hash__ = int.__hash__
+
+class CountingList(list):
+    # A list that counts indexed reads and element writes. Slices stay
+    # CountingLists so recursive sorts on slices keep counting.
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CountingList(list.__getitem__(self, index))
+        _tally.reads += 1
+        return list.__getitem__(self, index)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            _tally.writes += len(value)
+            _tally.last_write = None
+            list.__setitem__(self, index, value)
+            return
+        _tally.writes += 1
+        old = list.__getitem__(self, index)
+        last = _tally.last_write
+        # a[i], a[j] = a[j], a[i] writes a[j]'s value to i, then a[i]'s old
+        # value to j; the same objects moving both ways make it a swap.
+        if last is not None and last[0] != index and last[2] is old and value is last[1]:
+            _tally.swaps += 1
+            _tally.last_write = None
+        else:
+            _tally.last_write = (index, old, value)
+        list.__setitem__(self, index, value)
+
+def _depth_profiler(filename, depth):
+    # sys.setprofile hook keeping [current, deepest] call depth of the named
+    # functions in one source file. Generators count too: every resume is a
+    # call event and every yield a return event.
+    def profile(frame, event, arg):
+        code = frame.f_code
+        if code.co_filename != filename or code.co_name.startswith("<"):
+            return
+        if event == "call":
+            depth[0] += 1
+            if depth[0] > depth[1]:
+                depth[1] = depth[0]
+        elif event == "return":
+            depth[0] -= 1
+    return profile
+
+def _traced(func, filename, *args):
+    # Run func(*args) under tracemalloc and the depth profiler; returns
+    # (result, peak bytes above the starting point, max depth).
+    depth = [0, 0]
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    sys.setprofile(_depth_profiler(filename, depth))
+    try:
+        result = func(*args)
+    finally:
+        sys.setprofile(None)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, peak - start, depth[1]
+
+def count_calls(func, arr, target=None):
+    # Operation counts of one call of a plain (non-generator) function.
+    global _tally
+    _tally = _Tally()
+    data = CountingList(CountingInt(x) for x in arr)
+    args = (data,) if target is None else (data, CountingInt(target))
+    try:
+        _, aux_bytes, max_depth = _traced(func, sys.modules[func.__module__].__file__, *args)
+        return OpCounts(_tally.comparisons, _tally.swaps, _tally.writes, _tally.reads, aux_bytes, max_depth)
+    finally:
+        _tally = None
+
+def count_steps(gen_func, arr):
+    # Operation counts of a step-event generator, from its events.
+    counts = dict.fromkeys(("compare", "swap", "write", "read"), 0)
+
+    def drain(data):
+        for step in gen_func(data):
+            counts[step[0]] += 1
+
+    _, aux_bytes, max_depth = _traced(drain, sys.modules[gen_func.__module__].__file__, list(arr))
+    return OpCounts(counts["compare"], counts["swap"], counts["write"] + 2 * counts["swap"],
+                    counts["read"], aux_bytes, max_depth)
+
+def format_count(count):
+    # 950, 1.2k, 34k, 1.5M – short enough to fit under a graph bar.
+    value = count
+    for suffix in ("", "k", "M"):
+        if value < 999.5:
+            break
+        value /= 1000
+    else:
+        suffix = "G"
+    if not suffix:
+        return str(count)
+    return f"{value:.1f}{suffix}" if value < 9.95 else f"{value:.0f}{suffix}"
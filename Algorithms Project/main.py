@@ -1,6 +1,14 @@
 
-import pygame, sys, random, time
-import professor_algos as p_algos  # Import the professor’s algorithms for timing
+import math, os, pygame, shutil, sys, tempfile, time
+from performance import (perf_algo_dict, ParallelTimer, aggregate_timings, performance_jobs, measure_operation_counts,
+                         measure_phases, summarize_times, split_cached_jobs, TimingCache, TIMING_CACHE, TIMING_SAMPLES)
+from performance import (complexity_curves, complexity_jobs, complexity_regressions, fit_curves,
+                         load_complexity_baseline)
+from instrument import format_count
+from distributions import DISTRIBUTIONS, generate
+from step_trace import Trace, TraceWriter, record, recordable
+import visual_algos
+from visual_algos import algo_dict, apply_step, step_indices, StepFeeder
 
 ###############################################################################
 # Helper function to format array display (shows only the first few elements)
@@ -70,6 +78,10 @@ class Button:
         self.text = text
         self.font = pygame.font.Font(None, font_size)
         self.txt_surface = self.font.render(text, True, pygame.Color('white'))
+
+    def set_text(self, text):
+        self.text = text
+        self.txt_surface = self.font.render(text, True, pygame.Color('white'))
         
     def draw(self, screen):
         pygame.draw.rect(screen, self.bg_color, self.rect)
@@ -96,181 +108,347 @@ class Checkbox:
         screen.blit(self.txt_surface, (self.rect.x + 30, self.rect.y))
 
 ###############################################################################
-# SORTING ALGORITHMS (generator versions used for animation)
+# COLUMN AGGREGATES – min / max / mean of the elements under each pixel column
+#
+# Built once per array in O(n); after that update() is handed every step
+# event before it is applied and adjusts only the columns whose values
+# changed, so a frame costs the columns touched, not a rescan of the array.
+# Sums are kept exactly. A min or max can only be lost when the value holding
+# it leaves; that column is marked stale and rescanned (n / width elements)
+# the next time it is drawn. Steps a generator already applied to the array
+# itself (race lanes) lose the overwritten value, so their columns are
+# rescanned whole.
 ###############################################################################
-def bubble_sort(arr):
-    n = len(arr)
-    for i in range(n):
-        swapped = False
-        for j in range(0, n - i - 1):
-            if arr[j] > arr[j+1]:
-                arr[j], arr[j+1] = arr[j+1], arr[j]
-                swapped = True
-                yield arr.copy()
-        if not swapped:
-            break
-    yield arr.copy()
-
-def merge_sort(arr):
-    def merge(arr, start, mid, end):
-        left, right = arr[start:mid], arr[mid:end]
-        i = j = 0
-        k = start
-        while i < len(left) and j < len(right):
-            if left[i] <= right[j]:
-                arr[k] = left[i]
-                i += 1
-            else:
-                arr[k] = right[j]
-                j += 1
-            k += 1
-            yield arr.copy()
-        while i < len(left):
-            arr[k] = left[i]
-            i += 1; k += 1
-            yield arr.copy()
-        while j < len(right):
-            arr[k] = right[j]
-            j += 1; k += 1
-            yield arr.copy()
-
-    def merge_sort_recursive(arr, start, end):
-        if end - start > 1:
-            mid = (start + end) // 2
-            yield from merge_sort_recursive(arr, start, mid)
-            yield from merge_sort_recursive(arr, mid, end)
-            yield from merge(arr, start, mid, end)
-        yield arr.copy()
-
-    yield from merge_sort_recursive(arr, 0, len(arr))
-
-def quick_sort(arr):
-    def partition(arr, low, high):
-        states = []
-        pivot = arr[high]
-        i = low - 1
-        for j in range(low, high):
-            if arr[j] < pivot:
-                i += 1
-                arr[i], arr[j] = arr[j], arr[i]
-                states.append(arr.copy())
-        arr[i+1], arr[high] = arr[high], arr[i+1]
-        states.append(arr.copy())
-        return i+1, states
-
-    def quick_sort_recursive(arr, low, high):
-        if low < high:
-            pivot_index, states = partition(arr, low, high)
-            for state in states:
-                yield state
-            yield from quick_sort_recursive(arr, low, pivot_index-1)
-            yield from quick_sort_recursive(arr, pivot_index+1, high)
-        yield arr.copy()
-
-    if len(arr) <= 1:
-        yield arr.copy()
-    else:
-        yield from quick_sort_recursive(arr, 0, len(arr)-1)
+class ColumnAggregates:
+    def __init__(self, arr, width, highlight=None):
+        self.arr, self.n, self.width = arr, len(arr), width
+        # Column c covers arr[bounds[c]:bounds[c + 1]]; needs n >= width.
+        self.bounds = [c * self.n // width for c in range(width + 1)]
+        self.sums, self.lows, self.highs = [], [], []
+        for c in range(width):
+            chunk = arr[self.bounds[c]:self.bounds[c + 1]]
+            self.sums.append(sum(chunk))
+            self.lows.append(min(chunk))
+            self.highs.append(max(chunk))
+        self.stale = set()
+        self.set_highlight(highlight)
+
+    def set_highlight(self, highlight):
+        # Per column count of elements equal to highlight (the search target).
+        self.highlight = highlight
+        self.hits = None
+        if highlight is not None:
+            self.hits = [self.arr[self.bounds[c]:self.bounds[c + 1]].count(highlight)
+                         for c in range(self.width)]
+
+    def column(self, i):
+        return ((i + 1) * self.width - 1) // self.n
+
+    def _replace(self, i, old, new):
+        c = self.column(i)
+        self.sums[c] += new - old
+        if new <= self.lows[c]:
+            self.lows[c] = new
+        elif old == self.lows[c]:
+            self.stale.add(c)
+        if new >= self.highs[c]:
+            self.highs[c] = new
+        elif old == self.highs[c]:
+            self.stale.add(c)
+        if self.hits is not None:
+            self.hits[c] += (new == self.highlight) - (old == self.highlight)
+
+    def update(self, step, applied=False):
+        # Call before apply_step(arr, step), while arr still has the old
+        # values, or with applied=True once the step is in arr.
+        op, i = step[0], step[1]
+        if op == "swap":
+            j = step[2]
+            if self.column(i) != self.column(j):
+                a, b = self.arr[i], self.arr[j]
+                if applied:
+                    a, b = b, a
+                self._replace(i, a, b)
+                self._replace(j, b, a)
+        elif op == "write":
+            if not applied:
+                self._replace(i, self.arr[i], step[2])
+                return
+            # Widen the bounds now so the scale stays right until the rescan.
+            c = self.column(i)
+            self.lows[c] = min(self.lows[c], step[2])
+            self.highs[c] = max(self.highs[c], step[2])
+            self.stale.add(c)
+
+    def get(self, c):
+        # (min, max, mean) of column c.
+        if c in self.stale:
+            chunk = self.arr[self.bounds[c]:self.bounds[c + 1]]
+            self.lows[c], self.highs[c] = min(chunk), max(chunk)
+            self.sums[c] = sum(chunk)
+            if self.hits is not None:
+                self.hits[c] = chunk.count(self.highlight)
+            self.stale.discard(c)
+        return self.lows[c], self.highs[c], self.sums[c] / (self.bounds[c + 1] - self.bounds[c])
+
+###############################################################################
+# BAR RENDERER
+#
+# draw_all() paints every bar and fixes the value scale; after that
+# draw_indices() repaints only the columns a step touched and returns their
+# rects for pygame.display.update(). With more bars than pixel columns each
+# pixel column shows its ColumnAggregates, painted straight into a PixelArray: a
+# solid bar up to the column minimum, a dimmer band up to the maximum and a
+# tick at the mean. Steps must reach update() before they are applied, or
+# after with applied=True.
+###############################################################################
+class BarRenderer:
+    def __init__(self, rect, background, bar_color, active_color, highlight_color, mean_color=(255, 255, 255)):
+        self.rect = rect
+        self.background = background
+        self.bar_color = bar_color
+        self.active_color = active_color
+        self.highlight_color = highlight_color
+        self.mean_color = mean_color
+        self.low = self.high = 0
+        self.highlight = None
+        self.columns = None
+
+    def _color(self, value, i, active):
+        if self.highlight is not None and value == self.highlight:
+            return self.highlight_color
+        if i in active:
+            return self.active_color
+        return self.bar_color
+
+    def _y(self, value):
+        span = (self.high - self.low) or 1
+        scale = (self.rect.height - 10) / span
+        return int(self.rect.bottom - (value - self.low) * scale)
+
+    def _bar_span(self, value):
+        # Top and bottom y of a bar, measured from the zero line so negative
+        # values hang below it.
+        if value >= 0:
+            return self._y(value), self._y(0)
+        return self._y(0), self._y(value)
+
+    def _dim(self, color):
+        return tuple((a + b) // 2 for a, b in zip(color, self.background))
 
-def radix_sort(arr):
-    def counting_sort(arr, exp):
+    def _draw_bar(self, screen, arr, i, active):
         n = len(arr)
-        output = [0] * n
-        count = [0] * 10
-        for i in range(n):
-            index = (arr[i] // exp) % 10
-            count[index] += 1
-        for i in range(1, 10):
-            count[i] += count[i-1]
-        for i in range(n-1, -1, -1):
-            index = (arr[i] // exp) % 10
-            output[count[index]-1] = arr[i]
-            count[index] -= 1
-        for i in range(n):
-            arr[i] = output[i]
-            yield arr.copy()
-    if not arr:
-        yield arr.copy()
-        return
-    max_num = max(arr)
-    exp = 1
-    while max_num // exp > 0:
-        yield from counting_sort(arr, exp)
-        exp *= 10
-    yield arr.copy()
-
-# For Linear Search, the global target_value is used.
-target_value = 50
-def linear_search(arr):
-    global target_value
-    for i in range(len(arr)):
-        yield arr.copy()
-        if arr[i] == target_value:
-            yield arr.copy()
-    yield arr.copy()
-
-# Dictionary mapping algorithm names to generator functions (for visualization).
-algo_dict = {
-    "Bubble Sort": bubble_sort,
-    "Merge Sort": merge_sort,
-    "Quick Sort": quick_sort,
-    "Radix Sort": radix_sort,
-    "Linear Search": linear_search
-}
+        x0 = self.rect.x + i * self.rect.width // n
+        x1 = self.rect.x + (i + 1) * self.rect.width // n
+        column = pygame.Rect(x0, self.rect.y, x1 - x0, self.rect.height)
+        screen.fill(self.background, column)
+        top, bottom = self._bar_span(arr[i])
+        screen.fill(self._color(arr[i], i, active), (x0, top, max(1, x1 - x0 - 1), bottom - top))
+        return column
+
+    def _draw_columns(self, screen, columns, active):
+        agg = self.columns
+        active = {agg.column(i) for i in active}
+        background = screen.map_rgb(self.background)
+        mean = screen.map_rgb(self.mean_color)
+        pixels = pygame.PixelArray(screen)
+        for c in columns:
+            low, high, average = agg.get(c)
+            x = self.rect.x + c
+            pixels[x, self.rect.y:self.rect.bottom] = background
+            if agg.hits is not None and agg.hits[c]:
+                color = self.highlight_color
+            else:
+                color = self.active_color if c in active else self.bar_color
+            pixels[x, self._y(high):self._y(low) + 1] = screen.map_rgb(self._dim(color))
+            # Solid up to the value nearest zero that every element reaches.
+            top, bottom = self._bar_span(low if low > 0 else high if high < 0 else 0)
+            pixels[x, top:bottom] = screen.map_rgb(color)
+            pixels[x, min(self._y(average), self.rect.bottom - 1)] = mean
+        pixels.close()
+
+    def update(self, arr, step, applied=False):
+        # Keep the column aggregates in step with arr; call before apply_step()
+        # or, for a step already in arr, with applied=True.
+        if self.columns is not None and self.columns.arr is arr:
+            self.columns.update(step, applied)
+
+    def draw_all(self, screen, arr, active=(), highlight=None):
+        self.highlight = highlight
+        screen.fill(self.background, self.rect)
+        if len(arr) > self.rect.width:
+            # A new array gets new aggregates; the same array has kept its
+            # own up to date through update().
+            if self.columns is None or self.columns.arr is not arr:
+                self.columns = ColumnAggregates(arr, self.rect.width, highlight)
+            elif self.columns.highlight != highlight:
+                self.columns.set_highlight(highlight)
+            self.low, self.high = min(0, min(self.columns.lows)), max(0, max(self.columns.highs))
+            self._draw_columns(screen, range(self.rect.width), active)
+        else:
+            self.columns = None
+            self.low, self.high = (min(0, min(arr)), max(0, max(arr))) if arr else (0, 0)
+            for i in range(len(arr)):
+                self._draw_bar(screen, arr, i, active)
+        return self.rect
+
+    def draw_indices(self, screen, arr, indices, active=()):
+        # Values outside the current scale (a write of a new extreme) need a
+        # full redraw; sorts only move values around, so that is rare.
+        if any(not self.low <= arr[i] <= self.high for i in indices):
+            return [self.draw_all(screen, arr, active, self.highlight)]
+        if self.columns is None:
+            return [self._draw_bar(screen, arr, i, active) for i in indices]
+        columns = {self.columns.column(i) for i in indices}
+        self._draw_columns(screen, columns, active)
+        return [pygame.Rect(self.rect.x + c, self.rect.y, 1, self.rect.height) for c in columns]
 
 ###############################################################################
-# PERFORMANCE MEASUREMENT & GRAPH DRAWING – Using the professor’s algorithms
+# RACE MODE – several sorts side by side on the same input
+#
+# Ctrl+click (or Shift+click) checks more than one sort; launching then
+# splits the bar area into one lane per sort. Each lane's generator sorts
+# the lane's own list in place and the bars are drawn straight from that
+# list, so a lane holds one copy of the input and skips apply_step(); its
+# renderer hears of every step after the fact (applied=True).
+#
+# Lanes advance on a shared cost clock: a step costs RACE_COSTS operations
+# and every lane runs until its count reaches the clock, so the speed setting
+# is operations per lane per frame. A frame steps the lanes in rounds of
+# RACE_QUANTUM operations, so one cut short by frame_budget still leaves them
+# level. They step on the main thread: worker threads would share the one
+# interpreter lock anyway and could not keep the clocks in lockstep.
 ###############################################################################
-# Create a dictionary mapping algorithm names to the professor’s pure functions.
-perf_algo_dict = {
-    "Bubble Sort": p_algos.bubble_sort,
-    "Merge Sort": p_algos.merge_sort,
-    "Quick Sort": p_algos.quick_sort,
-    "Radix Sort": p_algos.lsd_radix_sort,
-    "Linear Search": p_algos.linear_search_all
-}
-
-def measure_performance(arr):
-    # Time the sorting algorithms from the professor module.
-    perf = {}
-    runs = 5  # Number of runs for averaging
-    for name, func in perf_algo_dict.items():
-        if name == "Linear Search":
-            continue
-        total_time = 0
-        for _ in range(runs):
-            arr_copy = arr.copy()
-            start_time = time.perf_counter()
-            func(arr_copy)  # Run the pure function to completion.
-            total_time += time.perf_counter() - start_time
-        perf[name] = total_time / runs
-    return perf
-
-def measure_linear_search_performance(arr):
-    # Time the professor’s linear search.
-    perf = {}
-    runs = 5
-    total_time = 0
-    for _ in range(runs):
-        arr_copy = arr.copy()
-        start_time = time.perf_counter()
-        p_algos.linear_search_all(arr_copy, target_value)
-        total_time += time.perf_counter() - start_time
-    perf["Linear Search"] = total_time / runs
-    return perf
-
-def draw_performance_graph(screen, graph_rect, performance, font, is_linear_search=False, animation_percent=100):
+RACE_COSTS = {"swap": 2}  # a swap is two writes; compare, read and write cost 1
+RACE_QUANTUM = 32
+RACE_LABEL_HEIGHT = 18
+
+class RaceLane:
+    def __init__(self, name, arr, rect, renderer):
+        self.name = name
+        self.arr = arr
+        self.steps = algo_dict[name](arr)
+        self.label_rect = pygame.Rect(rect.x, rect.y, rect.width, RACE_LABEL_HEIGHT)
+        self.renderer = renderer
+        self.ops = 0
+        self.done = False
+        self.place = None  # finishing position once done
+        self.active = self.drawn_active = ()
+        self.touched = set()
+        self.drawn_label = None
+
+    def advance(self, clock):
+        # Step until this lane's operation count reaches clock; False once sorted.
+        while not self.done and self.ops < clock:
+            try:
+                step = next(self.steps)
+            except StopIteration:
+                self.done = True
+                self.active = ()
+                break
+            self.renderer.update(self.arr, step, applied=True)
+            self.active = step_indices(step)
+            self.touched.update(self.active)
+            self.ops += RACE_COSTS.get(step[0], 1)
+        return not self.done
+
+    def label(self):
+        if self.place is None:
+            return f"{self.name}  {self.ops:,} ops"
+        return f"{self.name}  {self.ops:,} ops  finished #{self.place}"
+
+    def _draw_label(self, screen, font, color):
+        self.drawn_label = self.label()
+        screen.fill((30, 30, 30), self.label_rect)
+        text = font.render(truncate_text(self.drawn_label, font, self.label_rect.width - 10), True, color)
+        screen.blit(text, (self.label_rect.x + 5, self.label_rect.centery - text.get_height() // 2))
+        return self.label_rect
+
+    def draw_all(self, screen, font, color):
+        self.touched = set()
+        self.drawn_active = self.active
+        return [self._draw_label(screen, font, color), self.renderer.draw_all(screen, self.arr, self.active)]
+
+    def draw_changes(self, screen, font, color):
+        # The bars touched since the last frame plus the ones losing their
+        # highlight, and the label while the count moves.
+        rects = []
+        if self.touched or self.drawn_active:
+            self.touched.update(self.drawn_active)
+            if len(self.touched) > len(self.arr) // 2:
+                rects.append(self.renderer.draw_all(screen, self.arr, self.active))
+            else:
+                rects.extend(self.renderer.draw_indices(screen, self.arr, self.touched, self.active))
+            self.touched = set()
+            self.drawn_active = self.active
+        if self.label() != self.drawn_label:
+            rects.append(self._draw_label(screen, font, color))
+        return rects
+
+def race_lanes(names, arr, rect, *colors):
+    # One lane per algorithm name, stacked top to bottom in rect, each with
+    # its own copy of arr; colors as for BarRenderer.
+    height = rect.height // len(names)
+    lanes = []
+    for k, name in enumerate(names):
+        lane_rect = pygame.Rect(rect.x, rect.y + k * height, rect.width, height)
+        bars = pygame.Rect(rect.x, lane_rect.y + RACE_LABEL_HEIGHT, rect.width, height - RACE_LABEL_HEIGHT - 2)
+        lanes.append(RaceLane(name, arr.copy(), lane_rect, BarRenderer(bars, *colors)))
+    return lanes
+
+def run_race(lanes, clock, goal, deadline):
+    # Advance every lane towards the cost clock goal (None: no limit) until
+    # deadline, in rounds of RACE_QUANTUM. Lanes that finish get their
+    # places, fewest operations first. Returns the clock reached.
+    while goal is None or clock < goal:
+        clock = clock + RACE_QUANTUM if goal is None else min(goal, clock + RACE_QUANTUM)
+        still_running = [lane.advance(clock) for lane in lanes]
+        if not any(still_running) or time.perf_counter() >= deadline:
+            break
+    placed = sum(lane.place is not None for lane in lanes)
+    for lane in sorted((lane for lane in lanes if lane.done and lane.place is None), key=lambda lane: lane.ops):
+        placed += 1
+        lane.place = placed
+    return clock
+
+###############################################################################
+# PERFORMANCE GRAPH DRAWING – timings come from performance.py
+###############################################################################
+GRAPH_COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0),
+                (255, 0, 255), (0, 255, 255), (255, 128, 0), (160, 160, 255)]
+
+def bar_labels(name):
+    # Short label lines for a bar: the first word plus any "(variant)" tag.
+    labels = [name.split()[0]]
+    if "(" in name:
+        labels.append(name[name.index("(") + 1:name.rindex(")")])
+    return labels
+
+def draw_error_bar(screen, x, y_low, y_high, color=(230, 230, 230)):
+    # Vertical whisker with short caps, from y_high (top) to y_low.
+    pygame.draw.line(screen, color, (x, y_high), (x, y_low), 1)
+    pygame.draw.line(screen, color, (x - 3, y_high), (x + 3, y_high), 1)
+    pygame.draw.line(screen, color, (x - 3, y_low), (x + 3, y_low), 1)
+
+def draw_performance_graph(screen, graph_rect, performance, font, is_linear_search=False, animation_percent=100,
+                           counts=None):
+    # performance maps names to performance.TimingStats: bars show the median
+    # and an error bar its 95% confidence interval. counts maps names to
+    # instrument.OpCounts; bars that have one also show their operation count
+    # (comparisons + writes) under the time.
     if not performance: 
         return
+    counts = counts or {}
     pygame.draw.rect(screen, (40, 40, 40), graph_rect)
     title_font = pygame.font.Font(None, 24)
-    title = title_font.render("Algorithm Performance (milliseconds)", True, (255, 255, 255))
+    heading = "Algorithm Performance (ms / operations)" if counts else "Algorithm Performance (milliseconds)"
+    title = title_font.render(heading, True, (255, 255, 255))
     title_x = graph_rect.x + (graph_rect.width - title.get_width()) // 2
     screen.blit(title, (title_x, graph_rect.y + 5))
     
-    if is_linear_search:
+    if is_linear_search and len(performance) == 1:
         name = "Linear Search"
-        t = performance.get(name, 0)
+        t = performance[name].median if name in performance else 0
         t_ms = t * 1000
         bar_width = graph_rect.width - 20
         bar_height = min((graph_rect.height - 50) * 0.9, (graph_rect.height - 50))
@@ -278,45 +456,212 @@ def draw_performance_graph(screen, graph_rect, performance, font, is_linear_sear
         bar_x = graph_rect.x + 10
         bar_y = graph_rect.y + graph_rect.height - animated_height - 20
         pygame.draw.rect(screen, (255, 0, 0), (bar_x, bar_y, bar_width, animated_height))
+        if name in performance and animation_percent >= 100 and t > 0:
+            stats = performance[name]
+            bottom = bar_y + animated_height
+            draw_error_bar(screen, bar_x + bar_width // 2, bottom - bar_height * stats.low / t,
+                           max(graph_rect.y + 25, bottom - bar_height * stats.high / t))
         name_surf = font.render(name, True, (255, 255, 255))
-        time_surf = font.render(f"{t_ms:.3f} ms", True, (255, 255, 255))
+        time_text = f"{t_ms:.3f} ms"
+        if name in counts:
+            time_text += f"   {format_count(counts[name].comparisons + counts[name].writes)} ops"
+        time_surf = font.render(time_text, True, (255, 255, 255))
         screen.blit(name_surf, (bar_x, bar_y - name_surf.get_height() - 2))
         screen.blit(time_surf, (bar_x + (bar_width - time_surf.get_width()) // 2, bar_y + animated_height + 2))
     else:
         bar_count = len(performance)
         bar_width = (graph_rect.width - 20) / bar_count
-        max_time = max(performance.values()) if performance else 1
+        # The scale runs to the highest interval end, so every error bar fits.
+        max_time = max(stats.high for stats in performance.values()) or 1
         scale_font = pygame.font.Font(None, 20)
+        # Narrow bars get smaller labels, cut to the bar width.
+        label_font = scale_font if bar_width >= 50 else pygame.font.Font(None, 16)
         max_ms = max_time * 1000
+        value_room = 34 if counts else 20
         pygame.draw.line(screen, (150, 150, 150), 
                          (graph_rect.x + 5, graph_rect.y + 25), 
-                         (graph_rect.x + 5, graph_rect.y + graph_rect.height - 20), 1)
+                         (graph_rect.x + 5, graph_rect.y + graph_rect.height - value_room), 1)
         scale_surf = scale_font.render(f"{max_ms:.2f}", True, (200, 200, 200))
         screen.blit(scale_surf, (graph_rect.x + 7, graph_rect.y + 25))
+        # Leave space between the title and the tallest bar for its labels,
+        # and under the bars for the time (and operation count) lines.
+        label_room = 16 * max(len(bar_labels(name)) for name in performance) - 6
         scale_surf = scale_font.render("0.00", True, (200, 200, 200))
-        screen.blit(scale_surf, (graph_rect.x + 7, graph_rect.y + graph_rect.height - 25))
+        screen.blit(scale_surf, (graph_rect.x + 7, graph_rect.y + graph_rect.height - value_room - 5))
         i = 0
-        for name, t in performance.items():
+        plot_height = graph_rect.height - 30 - value_room - label_room
+        for name, stats in performance.items():
+            t = stats.median
             t_ms = t * 1000
-            bar_height = (t / max_time) * (graph_rect.height - 50)
+            bar_height = (t / max_time) * plot_height
             animated_height = bar_height * (animation_percent / 100.0)
             bar_x = graph_rect.x + 25 + i * bar_width
-            bar_y = graph_rect.y + graph_rect.height - animated_height - 20
+            bar_y = graph_rect.y + graph_rect.height - animated_height - value_room
             bar_rect = pygame.Rect(bar_x, bar_y, bar_width - 5, animated_height)
-            colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0)]
-            pygame.draw.rect(screen, colors[i % len(colors)], bar_rect)
-            name_surf = scale_font.render(name.split()[0], True, (255, 255, 255))
-            name_x = bar_x + (bar_width - 5 - name_surf.get_width()) // 2
-            screen.blit(name_surf, (name_x, bar_y - name_surf.get_height() - 2))
-            time_surf = scale_font.render(f"{t_ms:.3f}", True, (255, 255, 255))
+            pygame.draw.rect(screen, GRAPH_COLORS[i % len(GRAPH_COLORS)], bar_rect)
+            label_y = bar_y
+            if animation_percent >= 100:
+                bottom = bar_y + animated_height
+                high_y = bottom - stats.high / max_time * plot_height
+                draw_error_bar(screen, bar_x + (bar_width - 5) // 2, bottom - stats.low / max_time * plot_height, high_y)
+                label_y = min(bar_y, high_y - 2)
+            # "Merge Sort (NumPy)" is labelled "Merge" with "NumPy" above it.
+            for label in reversed(bar_labels(name)):
+                name_surf = label_font.render(truncate_text(label, label_font, bar_width - 3), True, (255, 255, 255))
+                name_x = bar_x + (bar_width - 5 - name_surf.get_width()) // 2
+                label_y -= name_surf.get_height() + 2
+                screen.blit(name_surf, (name_x, label_y))
+            time_surf = label_font.render(f"{t_ms:.3f}", True, (255, 255, 255))
             time_x = bar_x + (bar_width - 5 - time_surf.get_width()) // 2
             screen.blit(time_surf, (time_x, bar_y + animated_height + 2))
+            if name in counts:
+                ops = counts[name].comparisons + counts[name].writes
+                ops_surf = label_font.render(format_count(ops), True, (200, 200, 200))
+                ops_x = bar_x + (bar_width - 5 - ops_surf.get_width()) // 2
+                screen.blit(ops_surf, (ops_x, bar_y + animated_height + 16))
             i += 1
 
+def draw_complexity_graph(screen, graph_rect, curves, font, regressions=None):
+    # Log-log time vs n for each algorithm in curves ({name: {n: seconds}}),
+    # with the fitted class and exponent in a legend on the right. Classes
+    # worse than the saved baseline are marked with "!".
+    regressions = regressions or {}
+    pygame.draw.rect(screen, (40, 40, 40), graph_rect)
+    title_font = pygame.font.Font(None, 24)
+    title = title_font.render("Time vs n, log-log (click for phases)", True, (255, 255, 255))
+    screen.blit(title, (graph_rect.x + (graph_rect.width - title.get_width()) // 2, graph_rect.y + 5))
+    points = [(n, t) for curve in curves.values() for n, t in curve.items()]
+    if not points:
+        waiting = font.render("Timing a range of sizes...", True, (200, 200, 200))
+        screen.blit(waiting, waiting.get_rect(center=graph_rect.center))
+        return
+    plot = pygame.Rect(graph_rect.x + 30, graph_rect.y + 27, graph_rect.width - 175, graph_rect.height - 45)
+    low_n, high_n = math.log(min(n for n, t in points)), math.log(max(n for n, t in points))
+    low_t, high_t = math.log(min(t for n, t in points)), math.log(max(t for n, t in points))
+
+    def to_xy(n, t):
+        fx = (math.log(n) - low_n) / ((high_n - low_n) or 1)
+        fy = (math.log(t) - low_t) / ((high_t - low_t) or 1)
+        return plot.x + fx * plot.width, plot.bottom - fy * plot.height
+
+    axis_font = pygame.font.Font(None, 14)
+    pygame.draw.line(screen, (150, 150, 150), plot.topleft, plot.bottomleft, 1)
+    pygame.draw.line(screen, (150, 150, 150), plot.bottomleft, plot.bottomright, 1)
+    for text, pos in ((f"{math.exp(high_t) * 1000:.3g}", (graph_rect.x + 3, plot.y)),
+                      ("ms", (graph_rect.x + 3, plot.y + 10)),
+                      (f"{math.exp(low_t) * 1000:.2g}", (graph_rect.x + 3, plot.bottom - 8)),
+                      (f"n={math.exp(low_n):.0f}", (plot.x, plot.bottom + 3)),
+                      (f"{math.exp(high_n):.0f}", (plot.right - 20, plot.bottom + 3))):
+        screen.blit(axis_font.render(text, True, (200, 200, 200)), pos)
+
+    fits = fit_curves(curves)
+    legend_x = plot.right + 10
+    names = [name for name in perf_algo_dict if name in curves]
+    for i, name in enumerate(names):
+        color = GRAPH_COLORS[i % len(GRAPH_COLORS)]
+        xy = [to_xy(n, curves[name][n]) for n in sorted(curves[name])]
+        if len(xy) > 1:
+            pygame.draw.lines(screen, color, False, xy, 2)
+        y = plot.y - 2 + i * 11
+        pygame.draw.rect(screen, color, (legend_x, y + 2, 6, 6))
+        fit_text = ""
+        if name in fits:
+            model, exponent = fits[name]
+            fit_text = f"{model} {exponent:.2f}" + (" !" if name in regressions else "")
+        fit_color = (255, 90, 90) if name in regressions else (255, 255, 255)
+        fit_surf = axis_font.render(fit_text, True, fit_color)
+        screen.blit(fit_surf, (graph_rect.right - 5 - fit_surf.get_width(), y))
+        room = graph_rect.right - 15 - fit_surf.get_width() - (legend_x + 9)
+        label = truncate_text(" ".join(bar_labels(name)), axis_font, room)
+        screen.blit(axis_font.render(label, True, (255, 255, 255)), (legend_x + 9, y))
+
+# Phase colors, handed out in the order the phases first appear; time
+# before any phase mark is grey.
+PHASE_COLORS = [(255, 90, 90), (90, 200, 255), (255, 200, 60), (120, 230, 120), (200, 120, 255),
+                (255, 140, 0), (0, 200, 170), (255, 110, 200), (170, 170, 255), (200, 230, 90),
+                (150, 90, 60), (90, 120, 255), (255, 255, 160), (0, 140, 90), (220, 220, 220)]
+
+def draw_phase_graph(screen, graph_rect, phases, performance, font):
+    # Stacked bars: each algorithm's time split into the phases its profiled
+    # run marked (phases maps names to profiling.PhaseProfile). A bar is as
+    # tall as the median timing when there is one, otherwise the profiled
+    # run; the phase shares come from the profiled run either way.
+    pygame.draw.rect(screen, (40, 40, 40), graph_rect)
+    title_font = pygame.font.Font(None, 24)
+    title = title_font.render("Time per phase, ms (click for bars)", True, (255, 255, 255))
+    screen.blit(title, (graph_rect.x + (graph_rect.width - title.get_width()) // 2, graph_rect.y + 5))
+    names = [name for name in perf_algo_dict if name in phases]
+    if not names:
+        waiting = font.render("Profiling the phases...", True, (200, 200, 200))
+        screen.blit(waiting, waiting.get_rect(center=graph_rect.center))
+        return
+    colors = {"other": (110, 110, 110)}
+    for name in names:
+        for phase in phases[name].seconds:
+            if phase not in colors:
+                colors[phase] = PHASE_COLORS[(len(colors) - 1) % len(PHASE_COLORS)]
+    totals = {name: performance[name].median if name in performance else phases[name].total for name in names}
+    max_total = max(totals.values()) or 1
+    plot = pygame.Rect(graph_rect.x + 30, graph_rect.y + 27, graph_rect.width - 175, graph_rect.height - 45)
+    axis_font = pygame.font.Font(None, 14)
+    pygame.draw.line(screen, (150, 150, 150), plot.topleft, plot.bottomleft, 1)
+    for text, pos in ((f"{max_total * 1000:.3g}", (graph_rect.x + 3, plot.y)),
+                      ("0", (graph_rect.x + 3, plot.bottom - 8))):
+        screen.blit(axis_font.render(text, True, (200, 200, 200)), pos)
+    bar_width = plot.width / len(names)
+    for i, name in enumerate(names):
+        profile = phases[name]
+        measured = sum(profile.seconds.values()) or 1
+        x = plot.x + 3 + i * bar_width
+        y = plot.bottom
+        for phase, seconds in profile.seconds.items():
+            height = totals[name] * seconds / measured / max_total * plot.height
+            pygame.draw.rect(screen, colors[phase], (x, y - height, bar_width - 4, math.ceil(height)))
+            y -= height
+        label = truncate_text(" ".join(bar_labels(name)), axis_font, bar_width - 2)
+        screen.blit(axis_font.render(label, True, (255, 255, 255)), (x, plot.bottom + 3))
+    # Legend in two columns on the right.
+    rows = (plot.height + 4) // 11
+    for k, (phase, color) in enumerate(colors.items()):
+        x = plot.right + 10 + (k // rows) * 68
+        y = plot.y - 2 + (k % rows) * 11
+        pygame.draw.rect(screen, color, (x, y + 2, 6, 6))
+        label = truncate_text(phase, axis_font, 58)
+        screen.blit(axis_font.render(label, True, (255, 255, 255)), (x + 9, y))
+
+def close_trace(trace, recorder):
+    # Finish a recording in progress and release a replayed trace; returns
+    # the (trace, recorder) pair to assign back.
+    if recorder is not None:
+        recorder.close()
+    if trace is not None:
+        trace.close()
+    return None, None
+
+def stop_steps(steps):
+    # Cancel a StepFeeder and wait for its thread; returns None to assign back.
+    if steps is not None:
+        steps.cancel()
+    return None
+
+# Random arrays go up to MAX_VISUAL_SIZE elements; past the width of the
+# display the bars become column aggregates. O(n^2) sorts are only timed up
+# to VISUAL_MAX_QUADRATIC elements, operation counts only taken up to
+# MAX_COUNTED_SIZE and runs only recorded up to MAX_RECORDED_SIZE elements
+# and MAX_TRACE_BYTES of trace.
+MAX_VISUAL_SIZE = 1_000_000
+VISUAL_MAX_QUADRATIC = 5000
+MAX_COUNTED_SIZE = 200
+MAX_RECORDED_SIZE = 10_000
+MAX_TRACE_BYTES = 16 << 20
+
 ###############################################################################
 # MAIN FUNCTION (UI + Visualization + Control Panel + Performance Graph)
+#
+# replay_path opens a saved step trace (Ctrl+S writes sort.trace) instead of
+# a random array.
 ###############################################################################
-def main():
+def main(replay_path=None):
     pygame.init()
     width, height = 1280, 720
     screen = pygame.display.set_mode((width, height))
@@ -333,6 +678,7 @@ def main():
     text_color = (255, 255, 255)
     bar_color  = (0, 150, 255)
     highlight_color = (0, 255, 0)
+    active_color    = (255, 165, 0)
     title_font   = pygame.font.Font(None, 32)
     regular_font = pygame.font.Font(None, 24)
     small_font   = pygame.font.Font(None, 20)
@@ -349,10 +695,10 @@ def main():
     step2_title_y           = 240
     algorithm_instr_y       = 265
     checkbox_start_y        = 290   
-    target_label_y          = 400
-    target_input_y          = 425
-    step3_title_y           = 460
-    chosen_algo_y           = 485
+    target_label_y          = 412
+    target_input_y          = 435
+    step3_title_y           = 463
+    chosen_algo_y           = 488
     launch_button_y         = 515  
     performance_graph_y     = 565  
     performance_graph_height= 145  
@@ -365,22 +711,121 @@ def main():
     enter_button = Button(content_start_x, button_row_y, button_width, 35, "ENTER", font_size=24)
     pause_button = Button(content_start_x + button_width + 10, button_row_y, button_width, 35, "PAUSE", font_size=24)
     reset_button = Button(content_start_x + 2 * (button_width + 10), button_row_y, button_width, 35, "RESET", font_size=24)
+    dist_names = list(DISTRIBUTIONS)
+    dist_index = 0
+    dist_button = Button(content_start_x + 150, random_input_y, panel_width - 180, 25,
+                         "Data: " + dist_names[dist_index], font_size=22)
     launch_button = Button(content_start_x, launch_button_y, panel_width - 30, 35, "LAUNCH ROCKET", font_size=24)
+    # Animation speed in generator steps per frame (None = turbo: run flat out
+    # and only show sampled frames). Click the button or use UP / DOWN.
+    speeds = [1, 4, 16, 64, 256, 1024, None]
+    speed_index = 0
+    speed_labels = ["Speed: turbo" if speed is None else f"Speed: {speed} step{'s' if speed > 1 else ''}/frame"
+                    for speed in speeds]
+    speed_button = Button(content_start_x + 150, target_input_y, panel_width - 180, 25,
+                          speed_labels[speed_index], font_size=22)
+    # Seconds of stepping allowed per frame, so the display holds 60 FPS at
+    # any speed; steps past it wait for the next frame.
+    frame_budget = 0.012
+    # Timings of an unchanged array and unchanged algorithms come from the
+    # cache (kept on disk between runs); "re-measure" times every launch
+    # afresh and stores the new samples.
+    timing_cache = TimingCache(path=TIMING_CACHE)
+    use_cache = True
+    cache_labels = {True: "Timings: cached", False: "Timings: re-measure"}
+    cache_button = Button(content_start_x + 150, step3_title_y, panel_width - 180, 22,
+                          cache_labels[use_cache], font_size=22)
 
-    algo_names = ["Bubble Sort", "Merge Sort", "Quick Sort", "Radix Sort", "Linear Search"]
+    algo_names = list(algo_dict)
     checkboxes = []
     for i, name in enumerate(algo_names):
         cb = Checkbox(content_start_x, checkbox_start_y + i * 20, name, font_size=22)
         checkboxes.append(cb)
 
-    arr = [random.randint(1, 100) for _ in range(20)]
+    # Panel text that never changes is rendered once.
+    static_text = [
+        (title_font.render("Step 1:", True, text_color), (content_start_x, step1_title_y)),
+        (regular_font.render("Enter comma separated Numbers:", True, text_color), (content_start_x, manual_input_label_y)),
+        (regular_font.render("Or", True, text_color), (content_start_x + 160, or_label_y)),
+        (regular_font.render("Generate Random (Enter size):", True, text_color), (content_start_x, random_label_y)),
+        (title_font.render("Step 2:", True, text_color), (content_start_x, step2_title_y)),
+        (regular_font.render("Pick sorting Algorithm (Ctrl+click to race):", True, text_color), (content_start_x, algorithm_instr_y)),
+        (title_font.render("Step 3:", True, text_color), (content_start_x, step3_title_y)),
+    ]
+    header_right = title_font.render("Sorting Visualization", True, text_color)
+    static_text.append((header_right, (panel_start_x + (panel_width - header_right.get_width()) // 2, curr_array_y)))
+    target_label = regular_font.render("Pick target value:", True, text_color)
+    perf_graph_rect = pygame.Rect(content_start_x, performance_graph_y, panel_width - 30, performance_graph_height)
+    panel_rect = pygame.Rect(panel_start_x, 0, panel_width, height)
+
+    renderer = BarRenderer(vis_rect, black, bar_color, active_color, highlight_color)
+    # Frame-time overlay on the right end of the header bar.
+    overlay_rect = pygame.Rect(header_rect.right - 420, header_rect.y, 420, header_rect.height)
+    array_text_rect = pygame.Rect(header_rect.x, header_rect.y, header_rect.width - overlay_rect.width, header_rect.height)
+    frame_ms = 0.0
+    # Input latency: an event read this frame arrived after the previous
+    # poll, so previous poll -> this frame on screen bounds how long it took
+    # to show a response.
+    input_ms = 0.0
+    last_poll = time.perf_counter()
+    full_redraw = True    # repaint everything and flip
+    panel_dirty = True    # repaint the right-hand panel
+    header_dirty = True   # re-render the array text
+    drawn_active = ()
+    drawn_highlight = None
+
+    arr = generate("random", 20)
+    # A launch records its steps to a trace file. Once the run is over it
+    # can be replayed from any point: Left rewinds, Right plays, Home / End
+    # jump to either end, PAUSE stops or restarts, and clicking the bars
+    # seeks to that fraction of the run. Only arrays of up to
+    # MAX_RECORDED_SIZE elements are recorded, and a run whose trace outgrows
+    # MAX_TRACE_BYTES (a quadratic sort near that size) is dropped.
+    trace_path = os.path.join(tempfile.gettempdir(), f"sort-visualizer-{os.getpid()}.trace")
+    trace = None      # finished trace available for replay
+    recorder = None   # TraceWriter of the run in progress
+    trace_pos = 0     # number of trace steps applied to arr
+    rewinding = False
+    if replay_path:
+        trace = Trace(replay_path)
+        arr = trace.initial
     original_arr = arr.copy()
 
     sorting = False
     current_step = None
+    active_indices = ()
+    race = None       # the RaceLanes of the last race launched
+    race_clock = 0
+    # Seconds the last frame spent drawing the lanes; stepping gets the rest
+    # of frame_budget, as every lane adds its own redraw.
+    race_draw_time = 0.0
     sort_completed = False
     performance = {}
-    sorting_start_time = None
+    op_counts = {}
+    # Clicking the graph cycles through the bars, time-vs-n curves for a
+    # sweep of sizes on the chosen distribution (see performance.py) and the
+    # time per phase of each sort on the current array (see profiling.py).
+    graph_modes = {"bars": "curves", "curves": "phases", "phases": "bars"}
+    graph_mode = "bars"
+    curves = {}
+    curve_key = None  # (distribution, target) the running sweep is for
+    regressions = {}
+    baseline = load_complexity_baseline()
+    phases = {}
+    phases_arr = None     # the array the phases are (being) profiled on
+    phases_future = None
+    # Timing runs happen in a process pool; results fill in the graph as they arrive.
+    timer = None
+    perf_samples = {}
+    uncached = {}  # name -> cache key of each launch timing still to be cached
+    # Operation counts are taken in the pool as well: tracemalloc traces a
+    # whole process, so a count run here would include the UI's allocations.
+    counts_future = None
+    # Visual time is the CPU time the step worker spent running the
+    # generator, not frame or queue waits, so it reflects algorithm work at
+    # any speed.
+    step_time = 0.0
+    steps_done = 0
     visual_timing = None
     animation_percent = 0
 
@@ -389,9 +834,41 @@ def main():
 
     while running:
         clock.tick(60)
-        for event in pygame.event.get():
+        frame_start = time.perf_counter()
+        arr_before = arr
+        seek_to = None
+        poll_time = time.perf_counter()
+        events = pygame.event.get()
+        input_seen = any(event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN) for event in events)
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                full_redraw = True
+            elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN):
+                panel_dirty = True
+            if event.type == pygame.KEYDOWN and event.key in (pygame.K_UP, pygame.K_DOWN):
+                delta = 1 if event.key == pygame.K_UP else -1
+                speed_index = min(max(speed_index + delta, 0), len(speeds) - 1)
+                speed_button.set_text(speed_labels[speed_index])
+            typing = numbers_input.active or random_size_input.active or target_input.active
+            if event.type == pygame.KEYDOWN and trace is not None and not typing:
+                if event.key in (pygame.K_HOME, pygame.K_END):
+                    seek_to = 0 if event.key == pygame.K_HOME else trace.steps
+                elif event.key == pygame.K_LEFT:
+                    sorting, rewinding = False, True
+                elif event.key == pygame.K_RIGHT:
+                    stop_steps(current_step)
+                    current_step = StepFeeder(trace.events(trace_pos))
+                    sorting, rewinding = True, False
+                elif event.key == pygame.K_s and event.mod & pygame.KMOD_CTRL:
+                    try:
+                        shutil.copyfile(trace.path, "sort.trace")
+                        print(f"Saved {trace.steps} steps to sort.trace")
+                    except shutil.SameFileError:
+                        print("Replaying sort.trace – already saved")
+                    except OSError as error:
+                        print(f"Could not save sort.trace: {error}")
 
             numbers_input.handle_event(event)
             random_size_input.handle_event(event)
@@ -401,9 +878,16 @@ def main():
             if event.type == pygame.MOUSEBUTTONDOWN:
                 for cb in checkboxes:
                     if cb.rect.collidepoint(event.pos):
-                        for other in checkboxes:
-                            other.checked = False
-                        cb.checked = True
+                        if pygame.key.get_mods() & (pygame.KMOD_CTRL | pygame.KMOD_SHIFT) and cb.text != "Linear Search":
+                            # Adds the sort to (or drops it from) a race.
+                            cb.checked = not cb.checked
+                            for other in checkboxes:
+                                if other.text == "Linear Search":
+                                    other.checked = False
+                        else:
+                            for other in checkboxes:
+                                other.checked = False
+                            cb.checked = True
 
                 if enter_button.rect.collidepoint(event.pos):
                     if numbers_input.text.strip():
@@ -412,6 +896,13 @@ def main():
                             if lst:
                                 arr = lst.copy()
                                 original_arr = lst.copy()
+                                # Pending step events refer to the old array.
+                                current_step = stop_steps(current_step)
+                                trace, recorder = close_trace(trace, recorder)
+                                race = None
+                                rewinding = False
+                                sorting = False
+                                active_indices = ()
                                 sort_completed = False
                             else:
                                 print("No valid numbers found.")
@@ -421,8 +912,14 @@ def main():
                         try:
                             size = int(random_size_input.text)
                             if size > 0:
-                                arr = [random.randint(1, 100) for _ in range(min(size, 100))]
+                                arr = generate(dist_names[dist_index], min(size, MAX_VISUAL_SIZE))
                                 original_arr = arr.copy()
+                                current_step = stop_steps(current_step)
+                                trace, recorder = close_trace(trace, recorder)
+                                race = None
+                                rewinding = False
+                                sorting = False
+                                active_indices = ()
                                 sort_completed = False
                             else:
                                 print("Enter a positive number for size")
@@ -433,8 +930,38 @@ def main():
                     random_size_input.text = ""
                     random_size_input.txt_surface = random_size_input.font.render("", True, random_size_input.color)
 
+                elif dist_button.rect.collidepoint(event.pos):
+                    # Cycle through the input distributions used by the random generator.
+                    dist_index = (dist_index + 1) % len(dist_names)
+                    dist_button.set_text("Data: " + dist_names[dist_index])
+
+                elif perf_graph_rect.collidepoint(event.pos):
+                    graph_mode = graph_modes[graph_mode]
+
+                elif speed_button.rect.collidepoint(event.pos):
+                    speed_index = (speed_index + 1) % len(speeds)
+                    speed_button.set_text(speed_labels[speed_index])
+
+                elif cache_button.rect.collidepoint(event.pos):
+                    use_cache = not use_cache
+                    cache_button.set_text(cache_labels[use_cache])
+
                 elif pause_button.rect.collidepoint(event.pos):
-                    sorting = not sorting
+                    if trace is not None and not sorting:
+                        # Replay from the current position, or from the start
+                        # once the end is reached.
+                        if trace_pos >= trace.steps:
+                            trace_pos = 0
+                            arr = trace.state_at(0)
+                        stop_steps(current_step)
+                        current_step = StepFeeder(trace.events(trace_pos))
+                        sorting = True
+                    else:
+                        sorting = not sorting
+                    rewinding = False
+
+                elif trace is not None and vis_rect.collidepoint(event.pos):
+                    seek_to = round((event.pos[0] - vis_rect.x) / vis_rect.width * trace.steps)
 
                 elif reset_button.rect.collidepoint(event.pos):
                     numbers_input.text = ""
@@ -446,19 +973,32 @@ def main():
                     for cb in checkboxes:
                         cb.checked = False
                     arr = original_arr.copy()
+                    current_step = stop_steps(current_step)
+                    trace, recorder = close_trace(trace, recorder)
+                    race = None
+                    trace_pos = 0
+                    rewinding = False
                     sorting = False
-                    current_step = None
+                    active_indices = ()
                     sort_completed = False
+                    if timer is not None:
+                        timer.cancel()
+                    curves, regressions, curve_key = {}, {}, None
+                    perf_samples, uncached = {}, {}
                     performance = {}
+                    op_counts = {}
+                    counts_future = None  # a count still running is discarded
+                    if phases_future is not None:
+                        phases_future.cancel()
+                    phases, phases_arr, phases_future = {}, None, None
+                    step_time = 0.0
+                    steps_done = 0
                     visual_timing = None
                     animation_percent = 0
 
                 elif launch_button.rect.collidepoint(event.pos):
-                    selected_algo = None
-                    for cb in checkboxes:
-                        if cb.checked:
-                            selected_algo = cb.text
-                            break
+                    selected = [cb.text for cb in checkboxes if cb.checked]
+                    selected_algo = selected[0] if selected else None
                     if selected_algo is None:
                         print("No algorithm selected!")
                     else:
@@ -466,107 +1006,286 @@ def main():
                             if target_input.text.strip():
                                 try:
                                     new_target = int(target_input.text)
-                                    globals()['target_value'] = new_target
+                                    visual_algos.target_value = new_target
                                 except ValueError:
                                     print("Invalid target value – using previous value")
                             target_input.text = ""
                             target_input.txt_surface = target_input.font.render("", True, target_input.color)
-                            performance = measure_linear_search_performance(original_arr)
+                            jobs = performance_jobs(original_arr, target=visual_algos.target_value)
+                            count_target = visual_algos.target_value
                         else:
-                            performance = measure_performance(original_arr)
-                            
+                            jobs = performance_jobs(original_arr, max_quadratic=VISUAL_MAX_QUADRATIC)
+                            count_target = None
+                        op_counts = {}
+                        if counts_future is not None:
+                            counts_future.cancel()
+                        counts_future = None
+                        perf_samples, jobs, uncached = split_cached_jobs(jobs, timing_cache, refresh=not use_cache)
+                        # Instrumented runs are slow; big arrays go without.
+                        counted = len(original_arr) <= MAX_COUNTED_SIZE
+                        if timer is not None:
+                            timer.cancel()
+                        elif jobs or counted:
+                            timer = ParallelTimer()
+                        if counted:
+                            counts_future = timer.call(measure_operation_counts, original_arr, count_target)
+                        if jobs:
+                            timer.submit(jobs)
+                        curve_key = None  # the cancel dropped any sweep; start it again
+                        performance = {name: summarize_times(perf_samples[name])
+                                       for name in perf_algo_dict if name in perf_samples}
+
                         arr = original_arr.copy()
-                        current_step = algo_dict[selected_algo](arr.copy())
+                        current_step = stop_steps(current_step)
+                        trace, recorder = close_trace(trace, recorder)
+                        race = None
+                        if len(selected) > 1:
+                            # Races are not recorded; the lanes hold their own arrays.
+                            race = race_lanes(selected, original_arr, vis_rect, black, bar_color, active_color,
+                                              highlight_color)
+                            race_clock = 0
+                            full_redraw = True
+                        else:
+                            # The generator works on its own copy; arr is the display
+                            # buffer. Its steps are recorded for replay as they play,
+                            # unless the array is too big or a manually entered value
+                            # does not fit in int64.
+                            steps = algo_dict[selected_algo](arr.copy())
+                            if len(arr) <= MAX_RECORDED_SIZE and recordable(arr):
+                                recorder = TraceWriter(trace_path, arr, max_bytes=MAX_TRACE_BYTES)
+                                steps = record(steps, recorder)
+                            elif len(arr) <= MAX_RECORDED_SIZE:
+                                print("Values outside the 64-bit range – this run is not recorded")
+                            current_step = StepFeeder(steps)
+                        trace_pos = 0
+                        rewinding = False
+                        active_indices = ()
                         sorting = True
                         sort_completed = False
-                        sorting_start_time = time.perf_counter()
+                        step_time = 0.0
+                        steps_done = 0
                         visual_timing = None
                         animation_percent = 0
         
-        if sorting:
+        is_linear_search = any(cb.checked and cb.text == "Linear Search" for cb in checkboxes)
+        if graph_mode == "curves":
+            wanted_key = (dist_names[dist_index], visual_algos.target_value if is_linear_search else None)
+            if curve_key != wanted_key:
+                if timer is None:
+                    timer = ParallelTimer()
+                timer.submit(complexity_jobs(*wanted_key))
+                curves, regressions, curve_key = {}, {}, wanted_key
+                panel_dirty = True
+        if graph_mode == "phases" and phases_arr is not original_arr and not is_linear_search:
+            if timer is None:
+                timer = ParallelTimer()
+            phases_future = timer.call(measure_phases, original_arr)
+            phases, phases_arr = {}, original_arr
+            panel_dirty = True
+        if phases_future is not None and phases_future.done():
+            if not phases_future.cancelled():
+                phases = phases_future.result()
+            phases_future = None
+            panel_dirty = True
+
+        if timer is not None and timer.busy():
+            # Sweep jobs build their input from a distribution; the bar
+            # timings carry the UI array.
+            results = timer.poll()
+            for name, times in aggregate_timings(r for r in results if r[0].arr is not None).items():
+                perf_samples.setdefault(name, []).extend(times)
+                if name in uncached and len(perf_samples[name]) >= TIMING_SAMPLES:
+                    timing_cache.put(uncached.pop(name), perf_samples[name])
+            performance = {name: summarize_times(perf_samples[name])
+                           for name in perf_algo_dict if name in perf_samples}
+            curves = complexity_curves((r for r in results if r[0].arr is None), curves)
+            if not timer.busy():
+                timing_cache.save()
+                if curve_key is not None:
+                    regressions = complexity_regressions(fit_curves(curves), baseline, curve_key[0])
+            panel_dirty = panel_dirty or bool(results)
+
+        if counts_future is not None and counts_future.done():
+            if not counts_future.cancelled():
+                op_counts = counts_future.result()
+            counts_future = None
+            panel_dirty = True
+
+        if seek_to is not None:
+            trace_pos = max(0, min(seek_to, trace.steps))
+            arr = trace.state_at(trace_pos)
+            sorting = rewinding = False
+            current_step = stop_steps(current_step)
+            active_indices = ()
+        if rewinding:
+            # Step back by the chosen speed (a keyframe interval in turbo);
+            # each position is rebuilt from the nearest keyframe.
+            trace_pos = max(0, trace_pos - (speeds[speed_index] or trace.interval))
+            arr = trace.state_at(trace_pos)
+            active_indices = ()
+            rewinding = trace_pos > 0
+
+        touched = set()
+        if sorting and race is not None:
+            limit = speeds[speed_index]
+            race_clock = run_race(race, race_clock, None if limit is None else race_clock + limit,
+                                  time.perf_counter() + max(0.002, frame_budget - race_draw_time))
+            if all(lane.done for lane in race):
+                sorting = False
+                sort_completed = True
+        elif sorting:
+            # Apply up to the chosen number of steps, but stop at frame_budget
+            # or when the worker has none ready; the frames in between are
+            # never drawn.
+            limit = speeds[speed_index]
+            deadline = time.perf_counter() + frame_budget
+            done = 0
             try:
-                arr = next(current_step).copy()
+                while limit is None or done < limit:
+                    step = current_step.poll()
+                    if step is None:
+                        break
+                    renderer.update(arr, step)
+                    apply_step(arr, step)
+                    active_indices = step_indices(step)
+                    touched.update(active_indices)
+                    header_dirty = header_dirty or step[0] in ("swap", "write")
+                    done += 1
+                    if time.perf_counter() >= deadline:
+                        break
             except StopIteration:
                 sorting = False
+                active_indices = ()
                 sort_completed = True
-                if sorting_start_time is not None:
-                    visual_timing = time.perf_counter() - sorting_start_time
-                    sorting_start_time = None
-
-        screen.fill(black)
-        pygame.draw.rect(screen, header_col, header_rect)
-        array_str = format_array(arr)
-        truncated_array = truncate_text(array_str, title_font, header_rect.width - 20)
-        array_surface = title_font.render(truncated_array, True, text_color)
-        screen.blit(array_surface, (header_rect.x + 10, header_rect.y + (header_rect.height - array_surface.get_height()) // 2))
-        
-        pygame.draw.rect(screen, black, vis_rect)
-        if arr:
-            max_val = max(arr)
-            if max_val == 0:
-                max_val = 1
-            bar_width = vis_rect.width / len(arr)
-            for i, value in enumerate(arr):
-                if any(cb.checked and cb.text == "Linear Search" for cb in checkboxes) and value == target_value:
-                    color = highlight_color
-                else:
-                    color = bar_color
-                bar_height = (value / max_val) * (vis_rect.height - 10)
-                x = vis_rect.x + i * bar_width
-                y = vis_rect.y + vis_rect.height - bar_height
-                pygame.draw.rect(screen, color, (x, y, bar_width - 1, bar_height))
-
-        pygame.draw.rect(screen, deep_gray, (panel_start_x, 0, panel_width, height))
-        header_right = title_font.render("Sorting Visualization", True, text_color)
-        screen.blit(header_right, (panel_start_x + (panel_width - header_right.get_width()) // 2, curr_array_y))
-        
-        step1_txt = title_font.render("Step 1:", True, text_color)
-        screen.blit(step1_txt, (content_start_x, step1_title_y))
-        manual_txt = regular_font.render("Enter comma separated Numbers:", True, text_color)
-        screen.blit(manual_txt, (content_start_x, manual_input_label_y))
-        numbers_input.draw(screen)
-        or_txt = regular_font.render("Or", True, text_color)
-        screen.blit(or_txt, (content_start_x + 160, or_label_y))
-        random_txt = regular_font.render("Generate Random (Enter size):", True, text_color)
-        screen.blit(random_txt, (content_start_x, random_label_y))
-        random_size_input.draw(screen)
-        enter_button.draw(screen)
-        pause_button.draw(screen)
-        reset_button.draw(screen)
-
-        step2_txt = title_font.render("Step 2:", True, text_color)
-        screen.blit(step2_txt, (content_start_x, step2_title_y))
-        algo_instr = regular_font.render("Pick sorting Algorithm:", True, text_color)
-        screen.blit(algo_instr, (content_start_x, algorithm_instr_y))
-        for cb in checkboxes:
-            cb.draw(screen)
-        if any(cb.checked and cb.text == "Linear Search" for cb in checkboxes):
-            target_label = regular_font.render("Pick target value:", True, text_color)
-            screen.blit(target_label, (content_start_x, target_label_y))
-            target_input.draw(screen)
-
-        step3_txt = title_font.render("Step 3:", True, text_color)
-        screen.blit(step3_txt, (content_start_x, step3_title_y))
-        selected_algo = next((cb.text for cb in checkboxes if cb.checked), None)
-        if selected_algo:
-            choose_txt = regular_font.render("You choose: " + selected_algo, True, text_color)
-            screen.blit(choose_txt, (content_start_x, chosen_algo_y))
-        launch_button.draw(screen)
-
-        perf_graph_rect = pygame.Rect(content_start_x, performance_graph_y, panel_width - 30, performance_graph_height)
-        is_linear_search = any(cb.checked and cb.text == "Linear Search" for cb in checkboxes)
-        
+                if recorder is not None:
+                    # record() has finished the file; the run can be replayed now,
+                    # unless the trace grew past MAX_TRACE_BYTES.
+                    path = recorder.close()
+                    trace, recorder = (Trace(path) if path else None), None
+                    if not path:
+                        print(f"Run took over {MAX_TRACE_BYTES >> 20} MB of trace – not recorded")
+            trace_pos += done
+            if trace is None or sort_completed and visual_timing is None:
+                # Live run: replays do not count towards the visual time.
+                step_time = current_step.seconds
+                steps_done += done
+                if sort_completed:
+                    visual_timing = step_time
+
+        highlight = visual_algos.target_value if is_linear_search else None
+        if arr is not arr_before or highlight != drawn_highlight:
+            full_redraw = True  # new array, or different bars highlighted
+
         if sort_completed and animation_percent < 100:
             animation_percent += 2
-        
-        draw_performance_graph(screen, perf_graph_rect, performance, small_font, is_linear_search, animation_percent)
-        
-        if sorting and current_step is not None and animation_percent > 0:
+            panel_dirty = True
+        if sorting and (current_step is not None or race is not None) and animation_percent > 0:
             animation_percent = 0
-         
-        pygame.display.flip()
+
+        dirty_rects = []
+        if full_redraw:
+            screen.fill(black)
+            if race is not None:
+                for lane in race:
+                    lane.draw_all(screen, small_font, text_color)
+            else:
+                renderer.draw_all(screen, arr, active_indices, highlight)
+            drawn_highlight = highlight
+            header_dirty = panel_dirty = True
+        elif race is not None:
+            draw_start = time.perf_counter()
+            for lane in race:
+                dirty_rects.extend(lane.draw_changes(screen, small_font, text_color))
+            race_draw_time = time.perf_counter() - draw_start
+        elif drawn_active or touched:
+            # Repaint the bars this frame's steps touched plus the ones that
+            # lose their highlight; past half the array a full pass is cheaper.
+            touched.update(drawn_active)
+            if len(touched) > len(arr) // 2:
+                dirty_rects.append(renderer.draw_all(screen, arr, active_indices, highlight))
+            else:
+                dirty_rects.extend(renderer.draw_indices(screen, arr, touched, active_indices))
+        drawn_active = active_indices
+
+        if header_dirty:
+            pygame.draw.rect(screen, header_col, array_text_rect)
+            truncated_array = truncate_text(format_array(arr), title_font, array_text_rect.width - 20)
+            array_surface = title_font.render(truncated_array, True, text_color)
+            screen.blit(array_surface, (header_rect.x + 10, header_rect.y + (header_rect.height - array_surface.get_height()) // 2))
+            dirty_rects.append(array_text_rect)
+            header_dirty = False
+
+        if panel_dirty:
+            pygame.draw.rect(screen, deep_gray, panel_rect)
+            for surface, pos in static_text:
+                screen.blit(surface, pos)
+            numbers_input.draw(screen)
+            random_size_input.draw(screen)
+            dist_button.draw(screen)
+            speed_button.draw(screen)
+            cache_button.draw(screen)
+            enter_button.draw(screen)
+            pause_button.draw(screen)
+            reset_button.draw(screen)
+            for cb in checkboxes:
+                cb.draw(screen)
+            if is_linear_search:
+                screen.blit(target_label, (content_start_x, target_label_y))
+                target_input.draw(screen)
+            selected = [cb.text for cb in checkboxes if cb.checked]
+            if selected:
+                if len(selected) > 1:
+                    chosen = "Race: " + " vs ".join(name.replace(" Sort", "") for name in selected)
+                else:
+                    chosen = "You choose: " + selected[0]
+                choose_txt = regular_font.render(truncate_text(chosen, regular_font, panel_width - 30), True, text_color)
+                screen.blit(choose_txt, (content_start_x, chosen_algo_y))
+            launch_button.draw(screen)
+            if graph_mode == "curves":
+                draw_complexity_graph(screen, perf_graph_rect, curves, small_font, regressions)
+            elif graph_mode == "phases" and not is_linear_search:
+                draw_phase_graph(screen, perf_graph_rect, phases, performance, small_font)
+            elif performance:
+                draw_performance_graph(screen, perf_graph_rect, performance, small_font, is_linear_search,
+                                       animation_percent, op_counts)
+            else:
+                hint = small_font.render("Click here for time-vs-n curves", True, (150, 150, 150))
+                screen.blit(hint, hint.get_rect(center=perf_graph_rect.center))
+            dirty_rects.append(panel_rect)
+            panel_dirty = False
+
+        # Time spent on this frame's work (events, step, drawing), smoothed.
+        frame_ms = 0.9 * frame_ms + 0.1 * (time.perf_counter() - frame_start) * 1000
+        pygame.draw.rect(screen, header_col, overlay_rect)
+        if trace is not None:
+            status = f"replay {trace_pos}/{trace.steps}"
+        elif race is not None:
+            status = f"race {min(race_clock, max(lane.ops for lane in race)):,} ops"
+        else:
+            work_ms = (visual_timing if visual_timing is not None else step_time) * 1000
+            status = f"{steps_done} steps in {work_ms:.1f} ms"
+        overlay = small_font.render(f"frame {frame_ms:.2f} ms  input {input_ms:.1f} ms  {len(dirty_rects)} rects  |  {status}", True, text_color)
+        screen.blit(overlay, (overlay_rect.right - overlay.get_width() - 10,
+                              overlay_rect.y + (overlay_rect.height - overlay.get_height()) // 2))
+        dirty_rects.append(overlay_rect)
+
+        if full_redraw:
+            pygame.display.flip()
+            full_redraw = False
+        else:
+            pygame.display.update(dirty_rects)
+        if input_seen:
+            input_ms = (time.perf_counter() - last_poll) * 1000
+        last_poll = poll_time
+    if timer is not None:
+        timer.shutdown()
+    timing_cache.save()
+    stop_steps(current_step)
+    close_trace(trace, recorder)
+    if os.path.exists(trace_path):
+        os.remove(trace_path)
     pygame.quit()
     sys.exit()
 
 if __name__ == '__main__':
-    main()
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
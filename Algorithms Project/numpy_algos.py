@@ -0,0 +1,88 @@
+
+import numpy as np
+import professor_algos as p_algos
+
+###############################################################################
+# NUMPY BACKEND – whole-array versions of the professor's algorithms
+#
+# Same call signatures as professor_algos, but every pass works on an int64
+# NumPy array at once instead of element by element. The sorts return a new
+# sorted array; list input is converted first (and that cost is timed too).
+# Keys that do not fit an int64 (or, for merge_sort, its value bands) fall
+# back to the pure-Python versions, which return lists.
+###############################################################################
+def _int64(values):
+    # values as an int64 array, or None when some key does not fit.
+    try:
+        return np.asarray(values, dtype=np.int64)
+    except OverflowError:
+        return None
+
+def linear_search_all(L, T):
+    a = _int64(L)
+    if a is None:
+        return p_algos.linear_search_all(L, T)
+    return np.flatnonzero(a == T).tolist()
+
+def lsd_radix_sort(arr):
+    # Base-256 LSD radix sort. Keys are shifted by the minimum so negative
+    # numbers sort correctly, and passes where every key has the same digit
+    # are skipped.
+    a = _int64(arr)
+    if a is None:
+        return p_algos.lsd_radix_sort(list(arr))
+    if a.size <= 1:
+        return a.copy()
+    low = a.min()
+    keys = (a - low).astype(np.uint64)
+    max_key = int(keys.max())
+    n = keys.size
+    shift = 0
+    while max_key >> shift:
+        digits = ((keys >> np.uint64(shift)) & np.uint64(0xFF)).astype(np.uint8)
+        counts = np.bincount(digits, minlength=256)
+        if counts.max() < n:
+            # Bucket starts are the exclusive prefix sum of the histogram;
+            # a stable argsort of 8-bit digits (itself a radix sort inside
+            # NumPy) lays every key out at starts[digit] + rank in bucket.
+            order = np.argsort(digits, kind="stable")
+            keys = keys[order]
+        shift += 8
+    return keys.astype(np.int64) + low
+
+def merge_sort(arr):
+    # Bottom-up merge sort where each pass merges every pair of runs at once.
+    # Run pair p is lifted into its own value band (p * band), so a single
+    # searchsorted over all left runs against all right runs gives every
+    # element its output position: its index in its own half plus the number
+    # of smaller keys in the other half.
+    a = _int64(arr)
+    if a is None:
+        return p_algos.merge_sort(list(arr))
+    n = a.size
+    if n <= 1:
+        return a.copy()
+    low = int(a.min())
+    span = int(a.max()) - low + 1
+    band = span + 1
+    size = 1 << (n - 1).bit_length()
+    if (size // 2) * band >= 2**63:
+        return p_algos.merge_sort(a.tolist())
+    # Pad to a power of two with a key larger than every real one; the padding
+    # always ends up at the tail and is cut off at the end.
+    keys = np.full(size, span, dtype=np.int64)
+    keys[:n] = a - low
+    width = 1
+    while width < size:
+        pairs = size // (2 * width)
+        offsets = np.arange(pairs, dtype=np.int64) * band
+        blocks = keys.reshape(pairs, 2, width)
+        left = (blocks[:, 0, :] + offsets[:, None]).ravel()
+        right = (blocks[:, 1, :] + offsets[:, None]).ravel()
+        merged = np.empty(size, dtype=np.int64)
+        # Ties go to the left run first, which keeps the sort stable.
+        merged[np.arange(left.size) + np.searchsorted(right, left, side="left")] = left
+        merged[np.arange(right.size) + np.searchsorted(left, right, side="right")] = right
+        keys = merged - np.repeat(offsets, 2 * width)
+        width *= 2
+    return keys[:n] + low
@@ -0,0 +1,583 @@
+
+import gc, hashlib, importlib.util, json, math, os, signal, statistics, time
+from collections import OrderedDict, namedtuple
+import professor_algos as p_algos  # Import the professor’s algorithms for timing
+from instrument import count_calls
+import search
+
+# Optional vectorized backend. numpy takes longer to import than the rest of
+# the timing code put together, so numpy_algos is only imported by the first
+# call of one of its entries.
+HAVE_NUMPY = importlib.util.find_spec("numpy") is not None
+
+def numpy_backend(name):
+    # Stand-in for numpy_algos.<name>. It carries that name and module, so
+    # the pure-Python-only filters skip it like the real function.
+    def run(*args):
+        import numpy_algos
+        return getattr(numpy_algos, name)(*args)
+    run.__name__ = run.__qualname__ = name
+    run.__module__ = "numpy_algos"
+    return run
+
+###############################################################################
+# PERFORMANCE MEASUREMENT – Using the professor’s algorithms
+#
+# Kept free of pygame so the timing code can run headless (see bench.py).
+###############################################################################
+# Create a dictionary mapping algorithm names to the professor’s pure functions.
+perf_algo_dict = {
+    "Bubble Sort": p_algos.bubble_sort,
+    "Merge Sort": p_algos.merge_sort,
+    "Quick Sort": p_algos.quick_sort,
+    "Radix Sort": p_algos.lsd_radix_sort,
+    "Merge Sort (in-place)": p_algos.merge_sort_inplace,
+    "Quick Sort (in-place)": p_algos.quick_sort_inplace,
+    "Hybrid Sort": p_algos.hybrid_sort,
+    "Merge Sort (parallel)": p_algos.parallel_merge_sort,
+    "Radix Sort (parallel)": p_algos.parallel_radix_sort,
+    "Linear Search": p_algos.linear_search_all
+}
+
+# Allocation-free entries and the list-building algorithm each one replaces.
+inplace_algo_names = {
+    "Merge Sort (in-place)": "Merge Sort",
+    "Quick Sort (in-place)": "Quick Sort"
+}
+
+# Multi-process entries and the sequential algorithm each one speeds up.
+parallel_algo_names = {
+    "Merge Sort (parallel)": "Merge Sort",
+    "Radix Sort (parallel)": "Radix Sort"
+}
+
+# Entries of perf_algo_dict that take (array, target) instead of (array).
+search_algo_names = ("Linear Search",)
+
+# Search entries that answer a batch of targets per call (see search.py):
+# repeated linear scans, one scan for the whole batch, and the indexes.
+BATCH_TAG = f"(x{search.SEARCH_BATCH})"
+batch_search_names = (f"Linear Search {BATCH_TAG}", f"Scan Search {BATCH_TAG}",
+                      f"Hash Index {BATCH_TAG}", f"Sorted Index {BATCH_TAG}")
+perf_algo_dict.update(zip(batch_search_names, (search.repeated_linear_search, search.batched_linear_search,
+                                               search.hash_index_search, search.sorted_index_search)))
+search_algo_names += batch_search_names
+
+# O(n^2) entries, kept to small sizes by the benchmarks and size sweeps.
+quadratic_algo_names = {"Bubble Sort"}
+
+# With NumPy installed the vectorized backend is timed next to the pure
+# Python versions, so the same graph compares both.
+if HAVE_NUMPY:
+    perf_algo_dict.update({
+        "Merge Sort (NumPy)": numpy_backend("merge_sort"),
+        "Radix Sort (NumPy)": numpy_backend("lsd_radix_sort"),
+        "Linear Search (NumPy)": numpy_backend("linear_search_all")
+    })
+    perf_algo_dict[f"NumPy Index {BATCH_TAG}"] = search.numpy_index_search
+    search_algo_names += ("Linear Search (NumPy)", f"NumPy Index {BATCH_TAG}")
+    batch_search_names += (f"NumPy Index {BATCH_TAG}",)
+
+def time_runs(func, arr, runs, warmup=0, target=None):
+    # Run func on a fresh copy of arr warmup + runs times and return the
+    # timings (in seconds) of the last `runs` calls. The copy is a full
+    # slice, so a list stays a list and an array.array stays typed.
+    times = []
+    for r in range(warmup + runs):
+        arr_copy = arr[:]
+        if target is None:
+            start_time = time.perf_counter()
+            func(arr_copy)  # Run the pure function to completion.
+            elapsed = time.perf_counter() - start_time
+        else:
+            start_time = time.perf_counter()
+            func(arr_copy, target)
+            elapsed = time.perf_counter() - start_time
+        if r >= warmup:
+            times.append(elapsed)
+    return times
+
+###############################################################################
+# TIMING ENGINE – calibrated samples, GC off, median with a confidence interval
+#
+# A sort of 20 elements takes a few microseconds, close to the timer's
+# resolution and far below one GC pause. So one sample times `loops` calls
+# in a row, with loops calibrated until the sample lasts MIN_SAMPLE_TIME,
+# and the garbage collector is off while the clock runs. Samples outside
+# Tukey's fences (OUTLIER_K interquartile ranges beyond the quartiles) are
+# dropped; the rest give the median and a distribution-free 95% confidence
+# interval for it from the order statistics.
+###############################################################################
+MIN_SAMPLE_TIME = 0.002
+MAX_LOOPS = 1 << 16
+OUTLIER_K = 1.5
+TIMING_SAMPLES = 7
+
+# Seconds per call: median, 95% CI (low, high), samples kept and dropped.
+TimingStats = namedtuple("TimingStats", "median low high samples outliers")
+
+def time_sample(func, arr, loops, target=None):
+    # Seconds per call, averaged over `loops` calls that each get their own
+    # copy of arr, made before the clock starts.
+    copies = [arr[:] for _ in range(loops)]
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        if target is None:
+            start_time = time.perf_counter()
+            for arr_copy in copies:
+                func(arr_copy)
+        else:
+            start_time = time.perf_counter()
+            for arr_copy in copies:
+                func(arr_copy, target)
+        elapsed = time.perf_counter() - start_time
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return elapsed / loops
+
+def calibrate_loops(func, arr, target=None, min_time=MIN_SAMPLE_TIME):
+    # Calls per sample for samples of at least min_time. The calibration
+    # runs double as warmup.
+    loops = 1
+    while loops < MAX_LOOPS:
+        per_call = time_sample(func, arr, loops, target)
+        if per_call * loops >= min_time:
+            break
+        # Aim a little past min_time, but grow at most 10x per round.
+        loops = min(MAX_LOOPS, loops * 10, math.ceil(1.2 * min_time / max(per_call, 1e-9)))
+    return loops
+
+def summarize_times(times, outlier_k=OUTLIER_K):
+    times = sorted(times)
+    kept = times
+    if len(times) >= 4:
+        q1, _, q3 = statistics.quantiles(times, n=4)
+        fence = outlier_k * (q3 - q1)
+        kept = [t for t in times if q1 - fence <= t <= q3 + fence]
+    n = len(kept)
+    # Ranks n/2 -/+ 1.96 sqrt(n)/2 bound the median with ~95% confidence.
+    half = 1.96 * math.sqrt(n) / 2
+    low = kept[max(0, math.floor(n / 2 - half) - 1)]
+    high = kept[min(n - 1, math.ceil(n / 2 + half))]
+    return TimingStats(statistics.median(kept), low, high, n, len(times) - n)
+
+def measure_samples(func, arr, samples=TIMING_SAMPLES, target=None, min_time=MIN_SAMPLE_TIME):
+    loops = calibrate_loops(func, arr, target, min_time)
+    return [time_sample(func, arr, loops, target) for _ in range(samples)]
+
+def measure(func, arr, samples=TIMING_SAMPLES, target=None, min_time=MIN_SAMPLE_TIME):
+    return summarize_times(measure_samples(func, arr, samples, target, min_time))
+
+def measure_cached(name, arr, target=None, cache=None):
+    # measure() of perf_algo_dict[name], answered from a TimingCache when it
+    # has the samples already.
+    if cache is None:
+        return measure(perf_algo_dict[name], arr, target=target)
+    key = timing_key(TimingJob(name, len(arr), None, None, target, arr))
+    samples = cache.get(key)
+    if samples is None:
+        samples = measure_samples(perf_algo_dict[name], arr, target=target)
+        cache.put(key, samples)
+    return summarize_times(samples)
+
+def measure_performance(arr, cache=None):
+    # Time the sorting algorithms from the professor module.
+    return {name: measure_cached(name, arr, cache=cache) for name in perf_algo_dict
+            if name not in search_algo_names}
+
+def measure_linear_search_performance(arr, target, cache=None):
+    # Time the professor’s linear search and the batched / indexed searches.
+    return {name: measure_cached(name, arr, target, cache) for name in search_algo_names}
+
+def measure_operation_counts(arr, target=None):
+    # Comparisons, swaps, writes, aux memory and call depth of one run of each
+    # pure-Python entry (see instrument.py): the sorts, or with a target the
+    # searches. Multi-process and NumPy entries do their work outside this
+    # interpreter, so they are left out.
+    counts = {}
+    for name, func in perf_algo_dict.items():
+        if func.__module__ != p_algos.__name__ or name in parallel_algo_names:
+            continue
+        if (name in search_algo_names) == (target is not None):
+            counts[name] = count_calls(func, arr, target)
+    return counts
+
+def measure_phases(arr):
+    # Phase breakdown (profiling.PhaseProfile) of one run of each sort with
+    # phase marks: the pure-Python ones apart from Bubble Sort, which is a
+    # single phase.
+    from profiling import profile_phases
+    phases = {}
+    for name, func in perf_algo_dict.items():
+        if func.__module__ != p_algos.__name__ or name in parallel_algo_names:
+            continue
+        if name not in search_algo_names and name not in quadratic_algo_names:
+            phases[name] = profile_phases(func, arr)
+    return phases
+
+###############################################################################
+# PARALLEL TIMING – jobs spread over a process pool
+#
+# One job is one timing sample of one algorithm on one input: a calibrated
+# time_sample(), calibrated (and so warmed up) the first time a worker sees
+# the (algorithm, input) pair. Workers are pinned to a CPU each. Jobs carry
+# their array (small UI arrays) or rebuild it from (distribution, n, seed)
+# inside the worker, so big inputs are never pickled.
+###############################################################################
+TimingJob = namedtuple("TimingJob", "name n dist seed target arr typecode max_value")
+TimingJob.__new__.__defaults__ = (None, None, None, None)  # target, arr, typecode, max_value
+
+_worker_inputs = {}
+_worker_warmed = set()
+_worker_loops = {}
+
+def _stop_timing_worker(signum, frame):
+    from multiprocessing import util
+    p_algos.stop_pools()
+    # Run multiprocessing's exit hook, as its own children do before their
+    # os._exit, so the killed pools' queue semaphores are released.
+    util._exit_function()
+    os._exit(1)
+
+def _init_timing_worker(pids, cpus):
+    # ParallelTimer.shutdown() terminates busy workers. The pool would catch
+    # a SystemExit as the job's error, and exiting normally would wait on the
+    # parallel sorts' pools, so stop those, release what they share with the
+    # resource tracker and leave at once.
+    signal.signal(signal.SIGTERM, _stop_timing_worker)
+    # Note the PID for shutdown(), and pin each worker to its own CPU (round
+    # robin by PID slot) where the OS supports it.
+    index = p_algos.register_pid(pids)
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, {cpus[index % len(cpus)]})
+        except OSError:
+            pass
+
+def _job_input(job):
+    if job.arr is not None:
+        return job.arr
+    key = (job.dist, job.n, job.seed, job.typecode, job.max_value)
+    if key not in _worker_inputs:
+        from distributions import generate
+        options = {"typecode": job.typecode}
+        if job.max_value is not None:
+            options["max_value"] = job.max_value
+        _worker_inputs.clear()  # keep only one generated input per worker
+        _worker_inputs[key] = generate(job.dist, job.n, seed=job.seed, **options)
+    return _worker_inputs[key]
+
+def run_timing_job(job, warmup=1, calibrate=True):
+    # (job, seconds per call). With calibrate=False the sample is a single
+    # call, after `warmup` calls the first time.
+    arr = _job_input(job)
+    func = perf_algo_dict[job.name]
+    key = (job.name, job.dist, job.n, job.seed, job.typecode, job.max_value, job.arr is None)
+    if not calibrate:
+        if key in _worker_warmed:
+            warmup = 0
+        _worker_warmed.add(key)
+        return job, time_runs(func, arr, 1, warmup, job.target)[0]
+    if key not in _worker_loops:
+        _worker_loops[key] = calibrate_loops(func, arr, job.target)
+    return job, time_sample(func, arr, _worker_loops[key], job.target)
+
+class ParallelTimer:
+    # Non-blocking front end for the pool: submit() returns immediately and
+    # poll() hands back the (job, seconds) pairs that finished since the
+    # last call. A job that raised is reported once per algorithm and its
+    # sample dropped, so one broken entry cannot take the caller down.
+    def __init__(self, workers=None, pin_cpus=True):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+        self.workers = workers or len(cpus) or os.cpu_count() or 1
+        # spawn avoids forking a process that has SDL/pygame state loaded.
+        ctx = multiprocessing.get_context("spawn")
+        self.pids = ctx.Array("i", self.workers)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=ctx, initializer=_init_timing_worker,
+            initargs=(self.pids, cpus if pin_cpus else []))
+        # The multi-process entries start a pool of their own in the worker,
+        # which would inherit its CPU and multiply with the other workers'
+        # pools, so they go to one unpinned worker, one sample at a time.
+        self.parallel_pids = ctx.Array("i", 1)
+        self.parallel_executor = ProcessPoolExecutor(
+            max_workers=1, mp_context=ctx, initializer=_init_timing_worker, initargs=(self.parallel_pids, []))
+        self.pending = []  # (job, future)
+        self.failed = set()  # names of the algorithms reported as failing
+
+    def submit(self, jobs, warmup=1, calibrate=True):
+        for job in jobs:
+            executor = self.parallel_executor if job.name in parallel_algo_names else self.executor
+            self.pending.append((job, executor.submit(run_timing_job, job, warmup, calibrate)))
+
+    def poll(self):
+        results, still_pending = [], []
+        for job, f in self.pending:
+            if not f.done():
+                still_pending.append((job, f))
+            elif not f.cancelled():
+                error = f.exception()
+                if error is None:
+                    results.append(f.result())
+                elif job.name not in self.failed:
+                    self.failed.add(job.name)
+                    print(f"Timing {job.name} failed, samples dropped: {error!r}")
+        self.pending = still_pending
+        return results
+
+    def busy(self):
+        return bool(self.pending)
+
+    def call(self, func, *args):
+        # Any other picklable call on the pool, e.g. measure_phases; returns
+        # its Future, which poll() and cancel() leave alone.
+        return self.executor.submit(func, *args)
+
+    def cancel(self):
+        for job, f in self.pending:
+            f.cancel()
+        self.pending = []
+
+    def shutdown(self):
+        self.cancel()
+        # Running jobs cannot be cancelled and would hold up interpreter exit
+        # (a long sample, or phases on a big array), so stop the workers.
+        for executor, pids in ((self.executor, self.pids), (self.parallel_executor, self.parallel_pids)):
+            executor.shutdown(wait=False, cancel_futures=True)
+            p_algos.kill_pids(pids)
+
+def aggregate_timings(results):
+    # Group (job, seconds) pairs by algorithm name, keeping arrival order.
+    samples = {}
+    for job, seconds in results:
+        samples.setdefault(job.name, []).append(seconds)
+    return samples
+
+def performance_jobs(arr, target=None, runs=TIMING_SAMPLES, max_quadratic=None):
+    # The jobs behind measure_performance (target None) or
+    # measure_linear_search_performance (target given), one per sample.
+    # O(n^2) algorithms are left out above max_quadratic elements.
+    if target is None:
+        names = [name for name in perf_algo_dict if name not in search_algo_names]
+    else:
+        names = list(search_algo_names)
+    if max_quadratic is not None and len(arr) > max_quadratic:
+        names = [name for name in names if name not in quadratic_algo_names]
+    return [TimingJob(name, len(arr), None, None, target, arr) for name in names for _ in range(runs)]
+
+###############################################################################
+# RESULT CACHE – timing samples memoized per algorithm, input and code
+#
+# A key joins the algorithm name, a fingerprint of the input (a hash of its
+# values, or its distribution, size and seed), the search target and a
+# code version: a hash of the source of the algorithm's module and of this
+# file, so editing either one retires the old entries. The least recently
+# used entries are evicted first; with a path the cache is also loaded from
+# and saved to a JSON file, so results survive restarts.
+###############################################################################
+TIMING_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "timing_cache.json")
+TIMING_CACHE_SIZE = 1024
+
+_code_versions = {}
+
+def code_version(name):
+    module = perf_algo_dict[name].__module__
+    if module not in _code_versions:
+        digest = hashlib.sha1()
+        for path in (importlib.util.find_spec(module).origin, os.path.abspath(__file__)):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        _code_versions[module] = digest.hexdigest()[:16]
+    return _code_versions[module]
+
+def input_fingerprint(job):
+    if job.arr is None:
+        return f"{job.dist}/{job.n}/{job.seed}/{job.typecode}/{job.max_value}"
+    data = job.arr.tobytes() if hasattr(job.arr, "tobytes") else repr(list(job.arr)).encode()
+    return f"{type(job.arr).__name__}/{len(job.arr)}/{hashlib.sha1(data).hexdigest()[:16]}"
+
+def timing_key(job, fingerprint=None):
+    fingerprint = fingerprint or input_fingerprint(job)
+    return f"{job.name}|{fingerprint}|{job.target}|{code_version(job.name)}"
+
+class TimingCache:
+    # LRU map from timing_key() to a list of samples (seconds per call).
+    def __init__(self, capacity=TIMING_CACHE_SIZE, path=None):
+        self.capacity = capacity
+        self.path = path
+        self.entries = OrderedDict()
+        self.dirty = False
+        if path:
+            self.load()
+
+    def get(self, key):
+        samples = self.entries.get(key)
+        if samples is not None:
+            self.entries.move_to_end(key)
+        return samples
+
+    def put(self, key, samples):
+        self.entries[key] = list(samples)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        self.dirty = True
+
+    def load(self):
+        # Entries are stored oldest first, so the LRU order survives.
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)["entries"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        for key, samples in entries:
+            self.put(key, samples)
+        self.dirty = False
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        with open(self.path + ".tmp", "w") as f:
+            json.dump({"entries": list(self.entries.items())}, f)
+        os.replace(self.path + ".tmp", self.path)
+        self.dirty = False
+
+def split_cached_jobs(jobs, cache, refresh=False):
+    # ({name: cached samples}, jobs that still have to run, {name: key} for
+    # those jobs). With refresh every job runs. Each input is fingerprinted
+    # once, however many jobs share it – hashing a big array is not free.
+    cached, todo, keys, fingerprints = {}, [], {}, {}
+    for job in jobs:
+        if job.name in cached:
+            continue
+        if job.name not in keys:
+            if id(job.arr) not in fingerprints:
+                fingerprints[id(job.arr)] = input_fingerprint(job)
+            keys[job.name] = timing_key(job, fingerprints[id(job.arr)])
+        samples = None if refresh else cache.get(keys[job.name])
+        if samples is None:
+            todo.append(job)
+        else:
+            cached[job.name] = list(samples)
+    return cached, todo, {job.name: keys[job.name] for job in todo}
+
+###############################################################################
+# COMPLEXITY CURVES – time over a geometric series of sizes
+#
+# Each algorithm is timed at sizes start, start*2, ... and the points are
+# fitted two ways: the least-squares slope of log(time) over log(n) gives an
+# empirical exponent, and the model below whose c * f(n) is closest to the
+# points in log space names the complexity class. A baseline file records
+# the classes and exponents once; a later fit in a worse class is flagged as
+# a regression if its exponent also grew by more than COMPLEXITY_SLACK. Over
+# these sizes n and n log n differ by about 0.1 in exponent, no more than
+# timing noise moves it, so the class alone would flag false regressions.
+###############################################################################
+COMPLEXITY_MODELS = {
+    "n": lambda n: n,
+    "n log n": lambda n: n * math.log2(n),
+    "n^2": lambda n: n * n,
+}
+COMPLEXITY_SLACK = 0.25
+CURVE_MAX_QUADRATIC = 2048
+# Keys are drawn from 1..CURVE_KEY_RANGE * n. A fixed range would leave the
+# big inputs mostly duplicates, which the counting and three-way partition
+# paths sort in near linear time, so the fits would not show the sort.
+CURVE_KEY_RANGE = 16
+COMPLEXITY_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "complexity_baseline.json")
+
+def geometric_sizes(start, stop, factor=2):
+    sizes = []
+    n = start
+    while n <= stop:
+        sizes.append(int(n))
+        n *= factor
+    return sizes
+
+CURVE_SIZES = geometric_sizes(256, 16384)
+
+def fit_complexity(sizes, times):
+    # Returns (model name, empirical exponent) for one algorithm's points.
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in times]
+    x_mean, y_mean = sum(xs) / len(xs), sum(ys) / len(ys)
+    spread = sum((x - x_mean) ** 2 for x in xs)
+    exponent = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / spread if spread else 0.0
+
+    def residual(model):
+        # Best constant c is the mean gap in log space; score what is left.
+        gaps = [y - math.log(COMPLEXITY_MODELS[model](n)) for n, y in zip(sizes, ys)]
+        gap_mean = sum(gaps) / len(gaps)
+        return sum((g - gap_mean) ** 2 for g in gaps)
+
+    return min(COMPLEXITY_MODELS, key=residual), exponent
+
+def curve_max_value(n):
+    return CURVE_KEY_RANGE * n
+
+def complexity_rank(model):
+    # Position of a model from cheapest to most expensive growth.
+    return list(COMPLEXITY_MODELS).index(model)
+
+def complexity_jobs(dist, target=None, sizes=CURVE_SIZES, runs=3, seed=0):
+    # Timing jobs for the sweep: the sorts, or with a target the searches.
+    if target is None:
+        names = [name for name in perf_algo_dict if name not in search_algo_names]
+    else:
+        names = list(search_algo_names)
+    return [TimingJob(name, n, dist, seed, target, max_value=curve_max_value(n))
+            for name in names for n in sizes
+            if not (name in quadratic_algo_names and n > CURVE_MAX_QUADRATIC)
+            for _ in range(runs)]
+
+def complexity_curves(results, curves=None):
+    # Fold (job, seconds) pairs into {name: {n: fastest seconds}}.
+    curves = {} if curves is None else curves
+    for job, seconds in results:
+        points = curves.setdefault(job.name, {})
+        points[job.n] = min(seconds, points.get(job.n, seconds))
+    return curves
+
+def fit_curves(curves, min_points=3):
+    # {name: (model, exponent)} for every curve with enough points to fit.
+    fits = {}
+    for name, points in curves.items():
+        if len(points) >= min_points:
+            sizes = sorted(points)
+            fits[name] = fit_complexity(sizes, [points[n] for n in sizes])
+    return fits
+
+def load_complexity_baseline(path=COMPLEXITY_BASELINE):
+    # {"distribution": ..., "sizes": [...], "models": {name: model},
+    #  "exponents": {name: exponent}}, or None.
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_complexity_baseline(fits, dist, sizes, path=COMPLEXITY_BASELINE):
+    with open(path, "w") as f:
+        json.dump({"distribution": dist, "sizes": sizes,
+                   "models": {name: model for name, (model, exponent) in fits.items()},
+                   "exponents": {name: round(exponent, 3) for name, (model, exponent) in fits.items()}},
+                  f, indent=1)
+
+def complexity_regressions(fits, baseline, dist):
+    # Names whose fitted class is worse than the baseline's, as
+    # {name: (baseline model, new model)}. Only comparable on the same data.
+    if not baseline or baseline.get("distribution") != dist:
+        return {}
+    worse = {}
+    old_exponents = baseline.get("exponents", {})
+    for name, (model, exponent) in fits.items():
+        old = baseline["models"].get(name)
+        if old in COMPLEXITY_MODELS and complexity_rank(model) > complexity_rank(old):
+            if name in old_exponents and exponent - old_exponents[name] <= COMPLEXITY_SLACK:
+                continue
+            worse[name] = (old, model)
+    return worse
@@ -1,3 +1,18 @@
+import heapq, os
+from collections import Counter
+from array import array
+from itertools import chain, repeat
+
+# Every algorithm here takes a list or an array.array of ints.
+
+# Phase hook: profiling.py sets it to a recorder while it profiles a run,
+# otherwise it stays None and the marks below cost one global lookup.
+_phase = None
+
+def _like(arr, values):
+    # values in a form arr takes for slice assignment: array.array slices
+    # only take arrays of the same typecode, lists take any iterable.
+    return array(arr.typecode, values) if isinstance(arr, array) else values
 
 def linear_search_all(L, T):
     indices = []
@@ -16,11 +31,15 @@ def bubble_sort(arr):
 
 def merge_sort(arr):
     if len(arr) > 1:
+        if _phase:
+            _phase("split")
         mid = len(arr) // 2
         left_half = arr[:mid]
         right_half = arr[mid:]
         merge_sort(left_half)
         merge_sort(right_half)
+        if _phase:
+            _phase("merge")
         i = j = k = 0
         while i < len(left_half) and j < len(right_half):
             if left_half[i] < right_half[j]:
@@ -41,14 +60,21 @@ def merge_sort(arr):
 def quick_sort(arr):
     if len(arr) <= 1:
         return arr
+    if _phase:
+        _phase("partition")
     # Choose middle element as pivot.
     pivot = arr[len(arr) // 2]
     left = [x for x in arr if x < pivot]
     middle = [x for x in arr if x == pivot]
     right = [x for x in arr if x > pivot]
-    return quick_sort(left) + middle + quick_sort(right)
+    left, right = quick_sort(left), quick_sort(right)
+    if _phase:
+        _phase("concat")
+    return left + middle + right
 
 def counting_sort(arr, exp):
+    # One stable in-place pass on the decimal digit (x // exp) % 10. The
+    # radix sorts below use _counting_pass instead.
     n = len(arr)
     output = [0] * n
     count = [0] * 10
@@ -66,10 +92,556 @@ def counting_sort(arr, exp):
     return arr
 
 def lsd_radix_sort(arr):
-    max_num = max(arr)
-    exp = 1
-    while max_num // exp > 0:
-        counting_sort(arr, exp)
-        exp *= 10
+    return radix_sort(arr, RADIX_BASE)
+
+###############################################################################
+# RADIX ENGINE – LSD radix sort over power-of-two digits
+#
+# Digits are taken with shifts and masks instead of // and %. Keys are
+# offset by the minimum first, so negative numbers sort correctly, and a
+# pass is skipped when every key has the same digit in it.
+###############################################################################
+RADIX_BASE = 256
+
+def radix_digit_bits(base):
+    # log2(base); the base has to be a power of two of at least 2.
+    bits = base.bit_length() - 1
+    if base < 2 or base != 1 << bits:
+        raise ValueError(f"radix base must be a power of two, got {base}")
+    return bits
+
+def _counting_pass(keys, out, shift, mask):
+    # One stable pass on the digit (key >> shift) & mask, from keys into out.
+    # Returns False, leaving out untouched, when every key has the same digit.
+    if _phase:
+        _phase("histogram")
+    count = [0] * (mask + 1)
+    for key in keys:
+        count[(key >> shift) & mask] += 1
+    if max(count) == len(keys):
+        return False
+    total = 0
+    for digit, c in enumerate(count):
+        count[digit] = total
+        total += c
+    if _phase:
+        _phase("scatter")
+    for key in keys:
+        digit = (key >> shift) & mask
+        out[count[digit]] = key
+        count[digit] += 1
+    return True
+
+def radix_sort(arr, base=RADIX_BASE):
+    bits = radix_digit_bits(base)
+    if len(arr) <= 1:
+        return arr
+    if _phase:
+        _phase("offset")
+    low = min(arr)
+    return _radix_sort_range(arr, low, max(arr) - low, bits)
+
+def _radix_sort_range(arr, low, max_key, bits):
+    # radix_sort once the minimum and the largest offset key are known; the
+    # caller has already marked the "offset" phase.
+    base = 1 << bits
+    keys = [x - low for x in arr]
+    out = [0] * len(arr)
+    shift = 0
+    while max_key >> shift:
+        if _counting_pass(keys, out, shift, base - 1):
+            keys, out = out, keys
+        shift += bits
+    if _phase:
+        _phase("copy back")
+    arr[:] = _like(arr, [key + low for key in keys])
+    return arr
+
+
+###############################################################################
+# IN-PLACE VARIANTS – no per-level lists or slices
+#
+# Both sort arr itself and work on half-open ranges [lo, hi). Ranges of up
+# to INSERTION_SORT_CUTOFF elements are finished with insertion sort.
+###############################################################################
+INSERTION_SORT_CUTOFF = 16
+
+def insertion_sort(arr, lo=0, hi=None):
+    if _phase:
+        _phase("insertion")
+    if hi is None:
+        hi = len(arr)
+    for i in range(lo + 1, hi):
+        x = arr[i]
+        j = i - 1
+        while j >= lo and arr[j] > x:
+            arr[j + 1] = arr[j]
+            j -= 1
+        arr[j + 1] = x
+    return arr
+
+def _median_of_three(arr, a, b, c):
+    x, y, z = arr[a], arr[b], arr[c]
+    if x < y:
+        if y < z:
+            return b
+        return c if x < z else a
+    if x < z:
+        return a
+    return c if y < z else b
+
+def _choose_pivot(arr, lo, hi):
+    # Median of three for small ranges, Tukey's ninther for large ones.
+    if _phase:
+        _phase("pivot")
+    mid = (lo + hi) // 2
+    if hi - lo > 40:
+        step = (hi - lo) // 8
+        a = _median_of_three(arr, lo, lo + step, lo + 2 * step)
+        b = _median_of_three(arr, mid - step, mid, mid + step)
+        c = _median_of_three(arr, hi - 1 - 2 * step, hi - 1 - step, hi - 1)
+        return _median_of_three(arr, a, b, c)
+    return _median_of_three(arr, lo, mid, hi - 1)
+
+def _partition3(arr, lo, hi, pivot):
+    # 3-way partition: [lo, lt) < pivot, [lt, gt) == pivot, [gt, hi) > pivot.
+    if _phase:
+        _phase("partition")
+    lt, i, gt = lo, lo, hi
+    while i < gt:
+        x = arr[i]
+        if x < pivot:
+            arr[i] = arr[lt]
+            arr[lt] = x
+            lt += 1
+            i += 1
+        elif x > pivot:
+            gt -= 1
+            arr[i] = arr[gt]
+            arr[gt] = x
+        else:
+            i += 1
+    return lt, gt
+
+def _quick_sort_range(arr, lo, hi):
+    while hi - lo > INSERTION_SORT_CUTOFF:
+        lt, gt = _partition3(arr, lo, hi, arr[_choose_pivot(arr, lo, hi)])
+        # Recurse into the smaller side and loop on the larger one, so the
+        # recursion depth stays below log2(n) even on adversarial input.
+        if lt - lo < hi - gt:
+            _quick_sort_range(arr, lo, lt)
+            lo = gt
+        else:
+            _quick_sort_range(arr, gt, hi)
+            hi = lt
+    insertion_sort(arr, lo, hi)
+
+def quick_sort_inplace(arr):
+    _quick_sort_range(arr, 0, len(arr))
+    return arr
+
+def _merge_sort_range(arr, lo, hi, aux):
+    if hi - lo <= INSERTION_SORT_CUTOFF:
+        insertion_sort(arr, lo, hi)
+        return
+    mid = (lo + hi) // 2
+    _merge_sort_range(arr, lo, mid, aux)
+    _merge_sort_range(arr, mid, hi, aux)
+    _merge_with_buffer(arr, lo, mid, hi, aux)
+
+def _merge_with_buffer(arr, lo, mid, hi, aux):
+    # Merge the sorted runs [lo, mid) and [mid, hi) of arr.
+    if _phase:
+        _phase("merge")
+    if arr[mid - 1] <= arr[mid]:
+        return  # The two runs are already in order.
+    # Move the left run into the shared buffer (element by element, a slice
+    # would allocate) and merge it back with the right run.
+    left_len = mid - lo
+    for k in range(left_len):
+        aux[k] = arr[lo + k]
+    i, j, k = 0, mid, lo
+    while i < left_len and j < hi:
+        if arr[j] < aux[i]:
+            arr[k] = arr[j]
+            j += 1
+        else:
+            arr[k] = aux[i]
+            i += 1
+        k += 1
+    while i < left_len:
+        arr[k] = aux[i]
+        i += 1; k += 1
+
+def merge_sort_inplace(arr):
+    # One auxiliary buffer of n/2 slots is allocated up front and reused by
+    # every merge.
+    aux = [0] * (len(arr) // 2 + 1)
+    _merge_sort_range(arr, 0, len(arr), aux)
+    return arr
+
+###############################################################################
+# HYBRID SORT – picks a strategy from the size and shape of the data
+#
+#   * tiny inputs                 -> insertion sort
+#   * narrow key range (<= n)     -> one counting pass (radix with base >= range)
+#   * few natural runs            -> reverse descending runs, merge the runs
+#   * keys with few radix digits  -> LSD radix sort
+#   * long runs, but too many     -> Timsort-style: extend runs to 32 elements
+#                                    with insertion sort, then merge them
+#   * few distinct keys           -> count each key, sort only the keys
+#   * anything else               -> introsort: in-place 3-way quicksort with
+#                                    a ninther pivot, heapsort once the
+#                                    recursion gets deeper than 2*log2(n),
+#                                    insertion sort for small partitions
+#
+# The key range decides whether radix applies, so that is settled before
+# the run scan or the set of distinct keys is paid for; only a sample of
+# HYBRID_SAMPLE keys is checked for few distinct values first. Radix wins
+# when its base-256 digit passes number at most log2(n) - HYBRID_RADIX_SLACK
+# (measured against introsort from n = 200 to 50000). Merging natural runs
+# beats it only while log2(runs) is at most its pass count, so with radix in
+# reach the scan stops after 2**passes runs.
+###############################################################################
+# Runs are merged when there are at most n // HYBRID_RUN_DIVISOR of them,
+# and the data counts as partly ordered when the runs seen average at least
+# HYBRID_ORDERED_RUN elements. Keys are counted when at most
+# n // HYBRID_KEY_DIVISOR are distinct.
+HYBRID_RUN_DIVISOR = 16
+HYBRID_ORDERED_RUN = 4
+HYBRID_KEY_DIVISOR = 8
+HYBRID_RADIX_SLACK = 6
+HYBRID_SAMPLE = 256
+
+def _sift_down(arr, lo, root, size):
+    x = arr[lo + root]
+    while True:
+        child = 2 * root + 1
+        if child >= size:
+            break
+        if child + 1 < size and arr[lo + child + 1] > arr[lo + child]:
+            child += 1
+        if arr[lo + child] <= x:
+            break
+        arr[lo + root] = arr[lo + child]
+        root = child
+    arr[lo + root] = x
+
+def heap_sort(arr, lo=0, hi=None):
+    if _phase:
+        _phase("heap sort")
+    if hi is None:
+        hi = len(arr)
+    size = hi - lo
+    for root in range(size // 2 - 1, -1, -1):
+        _sift_down(arr, lo, root, size)
+    for end in range(size - 1, 0, -1):
+        arr[lo], arr[lo + end] = arr[lo + end], arr[lo]
+        _sift_down(arr, lo, 0, end)
+    return arr
+
+def _natural_runs(arr, max_runs):
+    # Boundaries of the maximal ascending / descending runs. The scan stops
+    # after max_runs + 1 runs, so bounds[-1] < len(arr) means there were too
+    # many. Equal keys may continue a descending run: the values are plain
+    # ints, so reversing it cannot reorder anything observable.
+    n = len(arr)
+    bounds = [0]
+    start = 0
+    while start < n and len(bounds) <= max_runs + 1:
+        end = start + 1
+        if end < n and arr[end] < arr[start]:
+            while end < n and arr[end] <= arr[end - 1]:
+                end += 1
+        else:
+            while end < n and arr[end] >= arr[end - 1]:
+                end += 1
+        bounds.append(end)
+        start = end
+    return bounds
+
+def _merge_natural_runs(arr, bounds):
+    if _phase:
+        _phase("reverse runs")
+    for start, end in zip(bounds, bounds[1:]):
+        if end - start > 1 and arr[end - 1] < arr[start]:
+            arr[start:end] = arr[start:end][::-1]
+    # Natural runs are uneven, so a left run can be almost the whole array.
+    aux = [0] * len(arr)
+    while len(bounds) > 2:
+        merged = [0]
+        for k in range(0, len(bounds) - 2, 2):
+            _merge_with_buffer(arr, bounds[k], bounds[k + 1], bounds[k + 2], aux)
+            merged.append(bounds[k + 2])
+        if len(bounds) % 2 == 0:
+            merged.append(bounds[-1])  # odd run out waits for the next round
+        bounds = merged
+
+def _min_length_runs(arr, min_run):
+    # Timsort-style runs: natural runs (descending ones reversed) extended to
+    # at least min_run elements with insertion sort.
+    n = len(arr)
+    bounds = [0]
+    start = 0
+    while start < n:
+        end = start + 1
+        if end < n and arr[end] < arr[start]:
+            while end < n and arr[end] <= arr[end - 1]:
+                end += 1
+            arr[start:end] = arr[start:end][::-1]
+        else:
+            while end < n and arr[end] >= arr[end - 1]:
+                end += 1
+        if end - start < min_run:
+            end = min(n, start + min_run)
+            insertion_sort(arr, start, end)
+        bounds.append(end)
+        start = end
+    return bounds
+
+def _write_counts(arr, key_counts):
+    # Overwrite arr with each key repeated count times, in the given order,
+    # in one slice assignment.
+    if _phase:
+        _phase("write counts")
+    arr[:] = _like(arr, chain.from_iterable(repeat(key, c) for key, c in key_counts))
+
+def _intro_sort_range(arr, lo, hi, depth):
+    while hi - lo > INSERTION_SORT_CUTOFF:
+        if depth == 0:
+            heap_sort(arr, lo, hi)
+            return
+        depth -= 1
+        lt, gt = _partition3(arr, lo, hi, arr[_choose_pivot(arr, lo, hi)])
+        if lt - lo < hi - gt:
+            _intro_sort_range(arr, lo, lt, depth)
+            lo = gt
+        else:
+            _intro_sort_range(arr, gt, hi, depth)
+            hi = lt
+    insertion_sort(arr, lo, hi)
+
+def hybrid_sort(arr):
+    n = len(arr)
+    if n <= INSERTION_SORT_CUTOFF:
+        return insertion_sort(arr)
+    if _phase:
+        _phase("detect")
+    low, high = min(arr), max(arr)
+    if high - low < n:
+        if _phase:
+            _phase("histogram")
+        count = [0] * (high - low + 1)
+        for x in arr:
+            count[x - low] += 1
+        _write_counts(arr, zip(range(low, high + 1), count))
+        return arr
+    passes = -(-(high - low).bit_length() // radix_digit_bits(RADIX_BASE))
+    sample = arr[::max(1, n // HYBRID_SAMPLE)]
+    few_keys = len(set(sample)) <= len(sample) // HYBRID_KEY_DIVISOR
+    use_radix = passes + HYBRID_RADIX_SLACK <= n.bit_length() and not few_keys
+    max_runs = max(1, n // HYBRID_RUN_DIVISOR)
+    if use_radix:
+        max_runs = min(max_runs, 1 << passes)
+    bounds = _natural_runs(arr, max_runs)
+    if bounds[-1] == n:
+        _merge_natural_runs(arr, bounds)
+        return arr
+    if use_radix:
+        if _phase:
+            _phase("offset")
+        return _radix_sort_range(arr, low, high - low, radix_digit_bits(RADIX_BASE))
+    if bounds[-1] >= HYBRID_ORDERED_RUN * (len(bounds) - 1):
+        _merge_natural_runs(arr, _min_length_runs(arr, 2 * INSERTION_SORT_CUTOFF))
+        return arr
+    depth = 2 * n.bit_length()
+    keys = set(arr)
+    if len(keys) <= n // HYBRID_KEY_DIVISOR:
+        keys = list(keys)
+        _intro_sort_range(keys, 0, len(keys), depth)
+        if _phase:
+            _phase("histogram")
+        count = Counter(arr)
+        _write_counts(arr, ((key, count[key]) for key in keys))
+        return arr
+    _intro_sort_range(arr, 0, n, depth)
+    return arr
+
+###############################################################################
+# PARALLEL VARIANTS – multiprocessing over a shared int64 buffer
+#
+# The input is copied once into a SharedMemory block of signed 64-bit ints;
+# workers attach to it by name and read/write their slice directly, so the
+# data itself is never pickled. Inputs below PARALLEL_MIN_SIZE fall back to
+# the sequential versions since process round trips would dominate.
+# multiprocessing is imported by these functions, not at the top, so the
+# sequential sorts import without it.
+###############################################################################
+PARALLEL_MIN_SIZE = 10000
+_pools = {}
+_pool_pids = {}  # workers -> shared array the pool's processes note their PIDs in
+_blocks = {}  # name -> SharedMemory this process created and has not yet freed
+
+def register_pid(pids):
+    # Pool initializer: note this process's PID in the first free slot of a
+    # shared int array and return the slot, so the pool can be killed later.
+    with pids.get_lock():
+        slot = pids[:].index(0)
+        pids[slot] = os.getpid()
+    return slot
+
+def kill_pids(pids):
+    import signal
+    for pid in pids:
+        if pid:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+def _get_pool(workers):
+    # Pools are reused across calls so timings measure the sort, not process
+    # start-up. spawn keeps this safe to call from the pygame process.
+    if workers not in _pools:
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import get_context, resource_tracker
+        # Start the resource tracker first so the workers share it with us;
+        # a tracker of their own would unlink our blocks when they exit.
+        resource_tracker.ensure_running()
+        ctx = get_context("spawn")
+        _pool_pids[workers] = ctx.Array("i", workers)
+        _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=register_pid,
+                                              initargs=(_pool_pids[workers],))
+    return _pools[workers]
+
+def stop_pools():
+    # Kill the pool processes outright, for a process that is itself being
+    # stopped mid-sort; the next parallel call starts fresh pools. The sort's
+    # finally blocks never run if the caller then hard-exits, so any shared
+    # blocks still live are unlinked here.
+    for workers, pool in _pools.items():
+        pool.shutdown(wait=False, cancel_futures=True)
+        kill_pids(_pool_pids[workers])
+    _pools.clear()
+    _pool_pids.clear()
+    for shm in list(_blocks.values()):
+        _free(shm)
+
+def _new_block(size):
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(create=True, size=max(1, size) * 8)
+    _blocks[shm.name] = shm
+    return shm
+
+def _free(shm):
+    # Release a block from _new_block. close() fails while a cast view of it
+    # is still alive (a sort interrupted mid-read); unlinking works regardless.
+    try:
+        shm.close()
+    except BufferError:
+        pass
+    shm.unlink()
+    del _blocks[shm.name]
+
+def _share(values):
+    shm = _new_block(len(values))
+    view = shm.buf.cast('q')
+    view[:len(values)] = array('q', values)
+    view.release()
+    return shm
+
+def _attach(name):
+    from multiprocessing import shared_memory
+    return shared_memory.SharedMemory(name=name)
+
+def _chunk_bounds(n, workers):
+    step = -(-n // workers)
+    return [(start, min(start + step, n)) for start in range(0, n, step)]
+
+def _merge_sort_chunk(name, start, stop):
+    shm = _attach(name)
+    view = shm.buf.cast('q')
+    view[start:stop] = array('q', merge_sort(view[start:stop].tolist()))
+    view.release()
+    shm.close()
+
+def parallel_merge_sort(arr, workers=None):
+    # Sort one chunk per worker in parallel, then k-way merge the sorted runs.
+    n = len(arr)
+    if n < PARALLEL_MIN_SIZE:
+        return merge_sort(arr)
+    workers = workers or os.cpu_count() or 1
+    bounds = _chunk_bounds(n, workers)
+    shm = _share(arr)
+    try:
+        list(_get_pool(workers).map(_merge_sort_chunk, [shm.name] * len(bounds),
+                                    [b[0] for b in bounds], [b[1] for b in bounds]))
+        view = shm.buf.cast('q')
+        runs = [view[start:stop].tolist() for start, stop in bounds]
+        view.release()
+    finally:
+        _free(shm)
+    arr[:] = _like(arr, heapq.merge(*runs))
     return arr
 
+def _radix_histogram(name, start, stop, shift):
+    shm = _attach(name)
+    view = shm.buf.cast('q')
+    count = [0] * 256
+    for key in view[start:stop]:
+        count[(key >> shift) & 0xFF] += 1
+    view.release()
+    shm.close()
+    return count
+
+def _radix_scatter(src_name, dst_name, start, stop, shift, offsets):
+    src_shm, dst_shm = _attach(src_name), _attach(dst_name)
+    src, dst = src_shm.buf.cast('q'), dst_shm.buf.cast('q')
+    for key in src[start:stop]:
+        digit = (key >> shift) & 0xFF
+        dst[offsets[digit]] = key
+        offsets[digit] += 1
+    src.release(); dst.release()
+    src_shm.close(); dst_shm.close()
+
+def parallel_radix_sort(arr, workers=None):
+    # Base-256 LSD radix sort. Each pass, every worker builds a histogram of
+    # its chunk; the parent turns them into per-worker bucket offsets (bucket
+    # order first, then worker order, so the pass stays stable) and the
+    # workers scatter their chunk into the other buffer. Keys are offset by
+    # the minimum, so negative numbers sort correctly.
+    n = len(arr)
+    if n < PARALLEL_MIN_SIZE:
+        return lsd_radix_sort(arr)
+    workers = workers or os.cpu_count() or 1
+    bounds = _chunk_bounds(n, workers)
+    starts, stops = [b[0] for b in bounds], [b[1] for b in bounds]
+    low = min(arr)
+    src = _share([x - low for x in arr])
+    dst = _new_block(n)
+    pool = _get_pool(workers)
+    try:
+        max_key = max(arr) - low
+        shift = 0
+        while max_key >> shift:
+            counts = list(pool.map(_radix_histogram, [src.name] * len(bounds), starts, stops,
+                                   [shift] * len(bounds)))
+            totals = [sum(c[d] for c in counts) for d in range(256)]
+            if max(totals) < n:  # otherwise every key shares this digit
+                position = 0
+                worker_offsets = [[0] * 256 for _ in counts]
+                for d in range(256):
+                    for w, c in enumerate(counts):
+                        worker_offsets[w][d] = position
+                        position += c[d]
+                list(pool.map(_radix_scatter, [src.name] * len(bounds), [dst.name] * len(bounds),
+                              starts, stops, [shift] * len(bounds), worker_offsets))
+                src, dst = dst, src
+            shift += 8
+        view = src.buf.cast('q')
+        arr[:] = _like(arr, [key + low for key in view[:n]])
+        view.release()
+    finally:
+        _free(src)
+        _free(dst)
+    return arr
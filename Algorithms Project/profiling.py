@@ -0,0 +1,165 @@
+
+import cProfile, inspect, os, pstats, sys, time, tracemalloc
+from collections import Counter, namedtuple
+
+###############################################################################
+# PHASE PROFILING – where an algorithm's time goes
+#
+# professor_algos and visual_algos mark the start of each named phase of
+# their algorithms ("split", "merge", "partition", "histogram", ...) with
+#     if _phase:
+#         _phase("merge")
+# _phase is None unless a profile is running, so the hooks cost one global
+# lookup while disabled. A mark ends the phase before it: time is charged to
+# the last phase marked, whichever call of a recursive algorithm marked it,
+# and time before the first mark goes to "other".
+#
+# The same hooks feed the on-demand captures: cProfile, tracemalloc (the
+# allocation sites alive at the end of the run, plus the peak per phase) and
+# folded stacks for flame graphs, where each phase shows up as a "[phase]"
+# frame under the call that marked it.
+###############################################################################
+HOOKED_MODULES = ("professor_algos", "visual_algos")
+PhaseProfile = namedtuple("PhaseProfile", "seconds peak_bytes total")
+
+class PhaseRecorder:
+    def __init__(self, memory=False):
+        self.seconds = {}
+        self.peak_bytes = {}
+        self.memory = memory
+        self.current = "other"
+        self.last = time.perf_counter()
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.seconds[self.current] = self.seconds.get(self.current, 0.0) + now - self.last
+        if self.memory:
+            # Peak since the last mark, above where tracing started.
+            peak = tracemalloc.get_traced_memory()[1] - self.base
+            self.peak_bytes[self.current] = max(self.peak_bytes.get(self.current, 0), peak)
+            tracemalloc.reset_peak()
+        self.current = name
+        self.last = time.perf_counter()  # the tracemalloc calls are not charged
+
+def _set_hook(hook):
+    for name in HOOKED_MODULES:
+        if name in sys.modules:
+            sys.modules[name]._phase = hook
+
+def _prepare(func, arr, target=None):
+    # A no-argument callable making one call on a copy of arr (made now, so
+    # it is not measured); generator functions are drained.
+    data = arr[:]
+    args = (data,) if target is None else (data, target)
+    if not inspect.isgeneratorfunction(func):
+        return lambda: func(*args)
+
+    def drain():
+        for _ in func(*args):
+            pass
+        return data
+    return drain
+
+def profile_phases(func, arr, target=None, memory=False):
+    # PhaseProfile of one call: seconds (and with memory=True the peak
+    # traced bytes) per phase, in the order the phases first ran. Tracing
+    # memory slows every allocation, so leave it off for the times.
+    call = _prepare(func, arr, target)
+    recorder = PhaseRecorder(memory)
+    if memory:
+        tracemalloc.start()
+        recorder.base = tracemalloc.get_traced_memory()[0]
+    _set_hook(recorder.mark)
+    try:
+        recorder.last = start = time.perf_counter()
+        call()
+        recorder.mark(None)
+        total = time.perf_counter() - start
+    finally:
+        _set_hook(None)
+        if memory:
+            tracemalloc.stop()
+    return PhaseProfile(recorder.seconds, recorder.peak_bytes, total)
+
+def capture_cprofile(func, arr, target=None):
+    # pstats.Stats of one call (print_stats() / dump_stats() as usual).
+    call = _prepare(func, arr, target)
+    profiler = cProfile.Profile()
+    profiler.runcall(call)
+    return pstats.Stats(profiler)
+
+def capture_tracemalloc(func, arr, target=None, limit=10):
+    # (peak traced bytes, the `limit` source lines holding the most memory
+    # when the call returns, as tracemalloc.Statistic).
+    call = _prepare(func, arr, target)
+    tracemalloc.start()
+    try:
+        result = call()
+        peak = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__),
+                                       tracemalloc.Filter(False, __file__)])
+    return peak, snapshot.statistics("lineno")[:limit]
+
+def _frame_label(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+def folded_stacks(func, arr, target=None):
+    # {"frame;frame;[phase];frame": microseconds} for one call, every Python
+    # and builtin call below func included – the "folded" input of
+    # flamegraph.pl, speedscope and friends. A deterministic profile: each
+    # call pays for the hook, so compare shapes rather than absolute times.
+    call = _prepare(func, arr, target)
+    stacks = Counter()
+    stack = []  # [path up to and including the frame, phase]
+    last = [0.0]
+
+    def path():
+        top, phase = stack[-1]
+        return f"{top};[{phase}]" if phase else top
+
+    def charge():
+        now = time.perf_counter()
+        if stack:
+            stacks[path()] += now - last[0]
+        last[0] = now
+
+    def mark(name):
+        charge()
+        if stack:
+            stack[-1][1] = name
+
+    def profile(frame, event, arg):
+        if frame.f_code.co_filename == __file__:
+            return  # the hooks themselves
+        if event in ("call", "c_call"):
+            charge()
+            label = _frame_label(frame.f_code) if event == "call" else \
+                getattr(arg, "__qualname__", repr(arg))
+            stack.append([f"{path()};{label}" if stack else label, None])
+        elif event in ("return", "c_return", "c_exception") and stack:
+            charge()
+            stack.pop()
+
+    _set_hook(mark)
+    sys.setprofile(profile)
+    try:
+        last[0] = time.perf_counter()
+        call()
+    finally:
+        sys.setprofile(None)
+        _set_hook(None)
+    return Counter({key: round(seconds * 1e6) for key, seconds in stacks.items() if seconds >= 5e-7})
+
+def write_folded(stacks, out):
+    # One "stack count" line per stack, heaviest first; out is a path or a file.
+    lines = "".join(f"{key} {count}\n" for key, count in stacks.most_common())
+    if hasattr(out, "write"):
+        out.write(lines)
+    else:
+        with open(out, "w") as f:
+            f.write(lines)
@@ -0,0 +1,128 @@
+
+from bisect import bisect_left, bisect_right
+import professor_algos as p_algos
+
+###############################################################################
+# SEARCH INDEXES – many lookups against the same array
+#
+# linear_search_all scans the whole array for every target. A SearchIndex is
+# built once – a value -> positions dict ("hash"), or the positions sorted by
+# value for bisect ("sorted") or np.searchsorted ("numpy") – and then answers
+# a target in O(1) / O(log n) plus its matches, or a whole batch of targets
+# with find_all(). Positions come back ascending, as from linear_search_all.
+#
+# The index is a snapshot of the array. Every lookup compares the length and
+# INDEX_SAMPLE evenly spaced values with the snapshot, and checks that the
+# positions it returns still hold their targets; if either changed, the index
+# is rebuilt. A write that hits neither goes unnoticed, so after writing to
+# the array in place call invalidate() (or invalidate(new_arr) to switch
+# arrays) and the next lookup rebuilds it.
+###############################################################################
+INDEX_KINDS = ("hash", "sorted", "numpy")
+INDEX_SAMPLE = 64
+
+class SearchIndex:
+    def __init__(self, arr, kind="hash"):
+        if kind not in INDEX_KINDS:
+            raise ValueError(f"Unknown index kind {kind!r}; choose from {', '.join(INDEX_KINDS)}")
+        self.kind = kind
+        self.builds = 0
+        self.invalidate(arr)
+
+    def invalidate(self, arr=None):
+        if arr is not None:
+            self.arr = arr
+        self.snapshot = None
+
+    def _fingerprint(self):
+        arr = self.arr
+        return len(arr), tuple(arr[::max(1, len(arr) // INDEX_SAMPLE)])
+
+    def _refresh(self):
+        fingerprint = self._fingerprint()
+        if self.snapshot == fingerprint:
+            return
+        arr = self.arr
+        if self.kind == "hash":
+            self.positions = {}
+            for i, value in enumerate(arr):
+                if value in self.positions:
+                    self.positions[value].append(i)
+                else:
+                    self.positions[value] = [i]
+        elif self.kind == "sorted":
+            # sorted() is stable, so equal keys keep their positions ascending.
+            self.order = sorted(range(len(arr)), key=arr.__getitem__)
+            self.keys = [arr[i] for i in self.order]
+        else:
+            import numpy as np
+            values = np.asarray(arr, dtype=np.int64)
+            self.order = np.argsort(values, kind="stable")
+            self.keys = values[self.order]
+        self.snapshot = fingerprint
+        self.builds += 1
+
+    def find(self, target):
+        # Positions of one target.
+        return self.find_all([target])[0]
+
+    def find_all(self, targets):
+        # Positions of every target, one list per target in the given order.
+        targets = list(targets)
+        self._refresh()
+        found = self._lookup(targets)
+        arr = self.arr
+        if any(arr[i] != t for t, positions in zip(targets, found) for i in positions):
+            self.invalidate()
+            self._refresh()
+            found = self._lookup(targets)
+        return found
+
+    def _lookup(self, targets):
+        if self.kind == "hash":
+            return [list(self.positions.get(t, ())) for t in targets]
+        if self.kind == "sorted":
+            keys, order = self.keys, self.order
+            return [order[bisect_left(keys, t):bisect_right(keys, t)] for t in targets]
+        # All the bisections in two vectorized calls; only the slicing is per target.
+        import numpy as np
+        targets = np.asarray(targets, dtype=np.int64)
+        starts = np.searchsorted(self.keys, targets, side="left").tolist()
+        stops = np.searchsorted(self.keys, targets, side="right").tolist()
+        return [self.order[a:b].tolist() for a, b in zip(starts, stops)]
+
+def batch_linear_search(L, targets):
+    # Positions of every target from a single scan of L, without an index.
+    found = {t: [] for t in targets}
+    for index, value in enumerate(L):
+        if value in found:
+            found[value].append(index)
+    return [list(found[t]) for t in targets]
+
+###############################################################################
+# BATCH SEARCH ENTRIES – perf_algo_dict functions with linear_search_all's
+# (L, T) signature. Each answers a batch of SEARCH_BATCH targets (T first)
+# and returns T's positions, so the graph and bench.py compare the cost of
+# the whole batch, index build included.
+###############################################################################
+SEARCH_BATCH = 64
+
+def batch_targets(L, T):
+    # T followed by values spread evenly through L.
+    step = max(1, len(L) // (SEARCH_BATCH - 1))
+    return [T] + list(L[::step][:SEARCH_BATCH - 1])
+
+def repeated_linear_search(L, T):
+    return [p_algos.linear_search_all(L, t) for t in batch_targets(L, T)][0]
+
+def batched_linear_search(L, T):
+    return batch_linear_search(L, batch_targets(L, T))[0]
+
+def hash_index_search(L, T):
+    return SearchIndex(L, "hash").find_all(batch_targets(L, T))[0]
+
+def sorted_index_search(L, T):
+    return SearchIndex(L, "sorted").find_all(batch_targets(L, T))[0]
+
+def numpy_index_search(L, T):
+    return SearchIndex(L, "numpy").find_all(batch_targets(L, T))[0]
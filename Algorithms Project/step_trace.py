@@ -0,0 +1,169 @@
+
+import mmap, os, struct
+from array import array
+
+###############################################################################
+# STEP TRACES – recorded step streams of the animation generators
+#
+# File layout (little endian):
+#   header    magic, version, n, keyframe interval K, step count
+#   initial   the n starting values as int64
+#   blocks    K step records, then the array after those steps (n int64),
+#             repeated; the last block may be short and has no keyframe
+# A step record is 13 bytes: op code (uint8), index (uint32) and an int64
+# that is the second index for compare/swap and the value for write. With
+# fixed-size records and keyframes every K steps, the file offset of step k
+# is plain arithmetic and any position is rebuilt from the keyframe before
+# it plus at most K - 1 steps.
+###############################################################################
+MAGIC = b"SORTTRC1"
+VERSION = 1
+HEADER = struct.Struct("<8sHIIQ")
+STEP = struct.Struct("<BIq")
+OPS = ("compare", "swap", "write", "read")
+OP_CODES = {op: code for code, op in enumerate(OPS)}
+SWAP, WRITE, READ = OP_CODES["swap"], OP_CODES["write"], OP_CODES["read"]
+
+def recordable(arr):
+    # Whether a run on arr fits the format: int64 values, uint32 indices.
+    return len(arr) < 1 << 32 and (not arr or -1 << 63 <= min(arr) and max(arr) < 1 << 63)
+
+def keyframe_interval(n):
+    # Keyframes cost at most 2 bytes per step and come at least 4096 steps apart.
+    return max(4096, 4 * n)
+
+class TraceWriter:
+    # With max_bytes, a recording that outgrows it is abandoned: the file is
+    # deleted, further steps are ignored and close() returns None.
+    def __init__(self, path, arr, interval=None, max_bytes=None):
+        self.path = path
+        self.n = len(arr)
+        self.interval = interval or keyframe_interval(self.n)
+        self.max_bytes = max_bytes
+        self.values = list(arr)  # replayed alongside, for the keyframes
+        self.steps = 0
+        self.dropped = False
+        self.buffer = bytearray()
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.n, self.interval, 0))
+        self.file.write(array('q', self.values).tobytes())
+
+    def add(self, step):
+        if self.dropped:
+            return
+        op = step[0]
+        if op == "write":
+            self.values[step[1]] = step[2]
+            arg = step[2]
+        elif op == "swap":
+            i, j = step[1], step[2]
+            self.values[i], self.values[j] = self.values[j], self.values[i]
+            arg = j
+        else:
+            arg = step[2] if len(step) > 2 else 0
+        self.buffer += STEP.pack(OP_CODES[op], step[1], arg)
+        self.steps += 1
+        if self.steps % self.interval == 0:
+            self.buffer += array('q', self.values).tobytes()
+        if len(self.buffer) >= 1 << 16:
+            self.file.write(self.buffer)
+            self.buffer.clear()
+            if self.max_bytes is not None and self.file.tell() > self.max_bytes:
+                self.dropped = True
+                self.buffer = bytearray()
+                self.file.close()
+                os.remove(self.path)
+
+    def close(self):
+        # Flush and fill in the step count; returns the path for Trace(), or
+        # None if the recording was abandoned. record() closes the writer when
+        # the stream ends, which can be before the UI gets to it, so a second
+        # close does nothing.
+        if self.dropped:
+            return None
+        if self.file.closed:
+            return self.path
+        self.file.write(self.buffer)
+        self.buffer.clear()
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.n, self.interval, self.steps))
+        self.file.close()
+        return self.path
+
+def record(steps, writer):
+    # Pass a step stream through unchanged while writing it to the trace;
+    # the file is complete once the stream is.
+    for step in steps:
+        writer.add(step)
+        yield step
+    writer.close()
+
+class Trace:
+    # Read-only, memory-mapped view of a trace file.
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        if size < HEADER.size:
+            self.file.close()
+            raise ValueError(f"{path} is not a sort trace")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.n, self.interval, self.steps = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} sort trace")
+        self.start = HEADER.size + 8 * self.n
+        self.initial = self._values(HEADER.size)
+
+    def _values(self, offset):
+        values = array('q')
+        values.frombytes(self.map[offset:offset + 8 * self.n])
+        return values.tolist()
+
+    def _offset(self, k):
+        # Byte offset of step k: k records plus one keyframe per full block.
+        return self.start + k * STEP.size + (k // self.interval) * 8 * self.n
+
+    def records(self, start=0, stop=None):
+        # Raw (op code, index, arg) tuples for steps start .. stop - 1.
+        stop = self.steps if stop is None else min(stop, self.steps)
+        k = max(0, start)
+        while k < stop:
+            block_end = min(stop, (k // self.interval + 1) * self.interval)
+            offset = self._offset(k)
+            yield from STEP.iter_unpack(self.map[offset:offset + (block_end - k) * STEP.size])
+            k = block_end
+
+    def events(self, start=0, stop=None):
+        # Steps start .. stop - 1 in the generators' event format.
+        for op, i, arg in self.records(start, stop):
+            yield ("read", i) if op == READ else (OPS[op], i, arg)
+
+    def state_at(self, k):
+        # The array after the first k steps.
+        k = max(0, min(k, self.steps))
+        block = k // self.interval
+        if block == 0:
+            values = list(self.initial)
+        else:
+            values = self._values(self._offset(block * self.interval) - 8 * self.n)
+        for op, i, arg in self.records(block * self.interval, k):
+            if op == SWAP:
+                values[i], values[arg] = values[arg], values[i]
+            elif op == WRITE:
+                values[i] = arg
+        return values
+
+    def close(self):
+        if getattr(self, "map", None) is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+def record_trace(gen_func, arr, path, interval=None):
+    # Run a generator to completion on a copy of arr, writing its steps to
+    # path. Returns the number of steps.
+    writer = TraceWriter(path, arr, interval)
+    for _ in record(gen_func(list(arr)), writer):
+        pass
+    return writer.steps
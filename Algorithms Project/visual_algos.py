@@ -0,0 +1,421 @@
+
+import queue, threading, time
+from collections import Counter
+from itertools import islice
+from professor_algos import radix_digit_bits
+
+###############################################################################
+# SORTING ALGORITHMS (generator versions used for animation)
+#
+# Each generator sorts its own working copy and yields small step events
+# instead of snapshots of the whole array:
+#   ("compare", i, j)  - arr[i] and arr[j] are being compared
+#   ("swap", i, j)     - arr[i] and arr[j] were swapped
+#   ("write", k, v)    - v was written to arr[k]
+#   ("read", i)        - arr[i] was inspected (linear search, radix digit counts)
+# The main loop replays them on its own display buffer with apply_step().
+# No pygame in here: bench.py and step_trace.py run these generators headless.
+#
+# The phase marks work as in professor_algos: profiling.py sets _phase while
+# it profiles a generator.
+###############################################################################
+_phase = None
+
+def apply_step(arr, step):
+    op = step[0]
+    if op == "swap":
+        i, j = step[1], step[2]
+        arr[i], arr[j] = arr[j], arr[i]
+    elif op == "write":
+        arr[step[1]] = step[2]
+
+def step_indices(step):
+    # Indices of the bars touched by a step (used for highlighting).
+    if step[0] == "write":
+        return (step[1],)
+    return step[1:]
+
+def bubble_sort(arr):
+    n = len(arr)
+    for i in range(n):
+        swapped = False
+        for j in range(0, n - i - 1):
+            yield ("compare", j, j+1)
+            if arr[j] > arr[j+1]:
+                arr[j], arr[j+1] = arr[j+1], arr[j]
+                swapped = True
+                yield ("swap", j, j+1)
+        if not swapped:
+            break
+
+def merge_sort(arr):
+    def merge(arr, start, mid, end):
+        if _phase:
+            _phase("merge")
+        left, right = arr[start:mid], arr[mid:end]
+        i = j = 0
+        k = start
+        while i < len(left) and j < len(right):
+            # Compare the slots the two halves originally came from.
+            yield ("compare", start + i, mid + j)
+            if left[i] <= right[j]:
+                arr[k] = left[i]
+                i += 1
+            else:
+                arr[k] = right[j]
+                j += 1
+            yield ("write", k, arr[k])
+            k += 1
+        while i < len(left):
+            arr[k] = left[i]
+            yield ("write", k, arr[k])
+            i += 1; k += 1
+        while j < len(right):
+            arr[k] = right[j]
+            yield ("write", k, arr[k])
+            j += 1; k += 1
+
+    def merge_sort_recursive(arr, start, end):
+        if end - start > 1:
+            if _phase:
+                _phase("split")
+            mid = (start + end) // 2
+            yield from merge_sort_recursive(arr, start, mid)
+            yield from merge_sort_recursive(arr, mid, end)
+            yield from merge(arr, start, mid, end)
+
+    yield from merge_sort_recursive(arr, 0, len(arr))
+
+def quick_sort(arr):
+    def partition(arr, low, high):
+        # Streams its steps as they happen; the pivot index is the return value.
+        if _phase:
+            _phase("partition")
+        pivot = arr[high]
+        i = low - 1
+        for j in range(low, high):
+            yield ("compare", j, high)
+            if arr[j] < pivot:
+                i += 1
+                arr[i], arr[j] = arr[j], arr[i]
+                yield ("swap", i, j)
+        arr[i+1], arr[high] = arr[high], arr[i+1]
+        yield ("swap", i+1, high)
+        return i+1
+
+    def quick_sort_recursive(arr, low, high):
+        while low < high:
+            pivot_index = yield from partition(arr, low, high)
+            # Recurse into the smaller side and loop on the larger one so the
+            # chain of nested generators stays O(log n) deep.
+            if pivot_index - low < high - pivot_index:
+                yield from quick_sort_recursive(arr, low, pivot_index-1)
+                low = pivot_index + 1
+            else:
+                yield from quick_sort_recursive(arr, pivot_index+1, high)
+                high = pivot_index - 1
+
+    if len(arr) > 1:
+        yield from quick_sort_recursive(arr, 0, len(arr)-1)
+
+def radix_sort(arr, base=16):
+    # LSD radix sort on power-of-two digits, like professor_algos.radix_sort.
+    # Base 16 gives the usual 1-100 values two visible passes. Each pass reads
+    # every bar to count its digit, then writes the bars back bucket by
+    # bucket; passes where all keys share the digit are skipped.
+    bits = radix_digit_bits(base)
+    if len(arr) <= 1:
+        return
+    mask = base - 1
+    low = min(arr)  # offset, so negative numbers sort too
+    max_key = max(arr) - low
+    shift = 0
+    while max_key >> shift:
+        if _phase:
+            _phase("histogram")
+        count = [0] * base
+        for i in range(len(arr)):
+            count[((arr[i] - low) >> shift) & mask] += 1
+            yield ("read", i)
+        if max(count) < len(arr):
+            if _phase:
+                _phase("scatter")
+            buckets = [[] for _ in range(base)]
+            for x in arr:
+                buckets[((x - low) >> shift) & mask].append(x)
+            k = 0
+            for bucket in buckets:
+                for x in bucket:
+                    arr[k] = x
+                    yield ("write", k, x)
+                    k += 1
+        shift += bits
+
+def hybrid_sort(arr):
+    # Same strategy choice as professor_algos.hybrid_sort: insertion sort for
+    # tiny inputs, counting for a narrow key range, merging natural runs,
+    # grouping few distinct keys, otherwise introsort (3-way quicksort that
+    # falls back to heapsort when it recurses too deep). The Timsort-style and
+    # radix branches only pay off on large inputs, so they are left out here.
+    cutoff = 16
+
+    def insertion(lo, hi):
+        if _phase:
+            _phase("insertion")
+        for i in range(lo + 1, hi):
+            j = i
+            while j > lo:
+                yield ("compare", j - 1, j)
+                if arr[j - 1] <= arr[j]:
+                    break
+                arr[j - 1], arr[j] = arr[j], arr[j - 1]
+                yield ("swap", j - 1, j)
+                j -= 1
+
+    def write_grouped(keys, count):
+        if _phase:
+            _phase("write counts")
+        k = 0
+        for key in keys:
+            for _ in range(count[key]):
+                arr[k] = key
+                yield ("write", k, key)
+                k += 1
+
+    def find_runs(max_runs):
+        # Returns the run boundaries, or None once there are too many runs.
+        if _phase:
+            _phase("detect")
+        bounds = [0]
+        start = 0
+        while start < n:
+            end = start + 1
+            if end < n:
+                yield ("compare", start, end)
+            if end < n and arr[end] < arr[start]:
+                while end < n and arr[end] <= arr[end - 1]:
+                    end += 1
+                    if end < n:
+                        yield ("compare", end - 1, end)
+            else:
+                while end < n and arr[end] >= arr[end - 1]:
+                    end += 1
+                    if end < n:
+                        yield ("compare", end - 1, end)
+            bounds.append(end)
+            if len(bounds) - 1 > max_runs:
+                return None
+            start = end
+        return bounds
+
+    def merge(lo, mid, hi):
+        if _phase:
+            _phase("merge")
+        left = arr[lo:mid]
+        i, j, k = 0, mid, lo
+        while i < len(left) and j < hi:
+            yield ("compare", lo + i, j)
+            if arr[j] < left[i]:
+                arr[k] = arr[j]
+                j += 1
+            else:
+                arr[k] = left[i]
+                i += 1
+            yield ("write", k, arr[k])
+            k += 1
+        while i < len(left):
+            arr[k] = left[i]
+            yield ("write", k, arr[k])
+            i += 1; k += 1
+
+    def merge_runs(bounds):
+        if _phase:
+            _phase("reverse runs")
+        for start, end in zip(bounds, bounds[1:]):
+            if end - start > 1 and arr[end - 1] < arr[start]:
+                lo, hi = start, end - 1
+                while lo < hi:
+                    arr[lo], arr[hi] = arr[hi], arr[lo]
+                    yield ("swap", lo, hi)
+                    lo += 1; hi -= 1
+        while len(bounds) > 2:
+            merged = [0]
+            for k in range(0, len(bounds) - 2, 2):
+                yield from merge(bounds[k], bounds[k + 1], bounds[k + 2])
+                merged.append(bounds[k + 2])
+            if len(bounds) % 2 == 0:
+                merged.append(bounds[-1])
+            bounds = merged
+
+    def sift_down(lo, root, size):
+        while 2 * root + 1 < size:
+            child = 2 * root + 1
+            if child + 1 < size:
+                yield ("compare", lo + child, lo + child + 1)
+                if arr[lo + child + 1] > arr[lo + child]:
+                    child += 1
+            yield ("compare", lo + root, lo + child)
+            if arr[lo + child] <= arr[lo + root]:
+                return
+            arr[lo + root], arr[lo + child] = arr[lo + child], arr[lo + root]
+            yield ("swap", lo + root, lo + child)
+            root = child
+
+    def heapsort(lo, hi):
+        if _phase:
+            _phase("heap sort")
+        size = hi - lo
+        for root in range(size // 2 - 1, -1, -1):
+            yield from sift_down(lo, root, size)
+        for end in range(size - 1, 0, -1):
+            arr[lo], arr[lo + end] = arr[lo + end], arr[lo]
+            yield ("swap", lo, lo + end)
+            yield from sift_down(lo, 0, end)
+
+    def intro(lo, hi, depth):
+        while hi - lo > cutoff:
+            if depth == 0:
+                yield from heapsort(lo, hi)
+                return
+            depth -= 1
+            if _phase:
+                _phase("partition")
+            # Median-of-three pivot, parked at lo so arr[lt] always holds it.
+            mid = (lo + hi) // 2
+            p = sorted((lo, mid, hi - 1), key=lambda idx: arr[idx])[1]
+            arr[lo], arr[p] = arr[p], arr[lo]
+            yield ("swap", lo, p)
+            pivot = arr[lo]
+            lt, i, gt = lo, lo + 1, hi
+            while i < gt:
+                yield ("compare", i, lt)
+                if arr[i] < pivot:
+                    arr[lt], arr[i] = arr[i], arr[lt]
+                    yield ("swap", lt, i)
+                    lt += 1; i += 1
+                elif arr[i] > pivot:
+                    gt -= 1
+                    arr[i], arr[gt] = arr[gt], arr[i]
+                    yield ("swap", i, gt)
+                else:
+                    i += 1
+            if lt - lo < hi - gt:
+                yield from intro(lo, lt, depth)
+                lo = gt
+            else:
+                yield from intro(gt, hi, depth)
+                hi = lt
+        yield from insertion(lo, hi)
+
+    n = len(arr)
+    if n <= cutoff:
+        yield from insertion(0, n)
+        return
+    low, high = min(arr), max(arr)
+    if high - low < n:
+        count = Counter(arr)
+        yield from write_grouped(range(low, high + 1), count)
+        return
+    bounds = yield from find_runs(max(1, n // 16))
+    if bounds is not None:
+        yield from merge_runs(bounds)
+        return
+    keys = set(arr)
+    if len(keys) <= n // 8:
+        yield from write_grouped(sorted(keys), Counter(arr))
+        return
+    yield from intro(0, n, 2 * n.bit_length())
+
+# For Linear Search, the global target_value is used.
+target_value = 50
+def linear_search(arr):
+    global target_value
+    for i in range(len(arr)):
+        yield ("read", i)
+        if arr[i] == target_value:
+            # Pause on a match for an extra frame.
+            yield ("read", i)
+
+# Dictionary mapping algorithm names to generator functions (for visualization).
+algo_dict = {
+    "Bubble Sort": bubble_sort,
+    "Merge Sort": merge_sort,
+    "Quick Sort": quick_sort,
+    "Radix Sort": radix_sort,
+    "Hybrid Sort": hybrid_sort,
+    "Linear Search": linear_search
+}
+
+###############################################################################
+# STEP FEEDER – a step stream produced on a worker thread
+#
+# The worker runs the generator (or trace replay) and hands its steps over
+# in batches through a bounded queue. When the render loop falls behind the
+# queue fills up and the worker blocks, so it is never more than
+# FEED_QUEUE_BATCHES * FEED_BATCH steps ahead. poll() never waits: it returns
+# the next step, None while the worker has none ready, and raises
+# StopIteration at the end of the stream (or the generator's own exception).
+# cancel() stops the worker and joins it, so afterwards nothing still writes
+# the recorder or reads the trace the stream came from.
+###############################################################################
+FEED_BATCH = 256
+FEED_QUEUE_BATCHES = 64
+
+class StepFeeder:
+    def __init__(self, steps, batch=FEED_BATCH, max_batches=FEED_QUEUE_BATCHES):
+        self.queue = queue.Queue(max_batches)
+        self.cancelled = threading.Event()
+        self.seconds = 0.0  # worker CPU time spent producing steps
+        self.batch, self.pos = [], 0
+        self.thread = threading.Thread(target=self._run, args=(steps, batch), daemon=True)
+        self.thread.start()
+
+    def _put(self, item):
+        # Blocks while the queue is full; False once cancelled.
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self, steps, size):
+        steps = iter(steps)
+        while True:
+            start = time.thread_time()
+            try:
+                batch = list(islice(steps, size))
+            except Exception as error:
+                self._put(error)
+                return
+            finally:
+                self.seconds += time.thread_time() - start
+            if not batch:
+                self._put(None)
+                return
+            if not self._put(batch):
+                return
+
+    def poll(self):
+        if self.pos == len(self.batch):
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return None
+            if item is None:
+                raise StopIteration
+            if isinstance(item, Exception):
+                raise item
+            self.batch, self.pos = item, 0
+        self.pos += 1
+        return self.batch[self.pos - 1]
+
+    def cancel(self):
+        self.cancelled.set()
+        try:
+            while True:
+                self.queue.get_nowait()  # wakes a worker blocked on a full queue
+        except queue.Empty:
+            pass
+        self.thread.join()